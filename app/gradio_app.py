@@ -6,21 +6,25 @@ import gradio as gr
 import joblib
 import pandas as pd
 
+from src.features.history import EMPTY_HISTORY
+from src.inference.sensitivity import numeric_range, sweep
+
 # ----------------------------
 # Load model artifact safely
 # ----------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ARTIFACT_PATH = os.path.join(BASE_DIR, "..", "..", "artifacts", "final_model.joblib")
+ARTIFACT_PATH = os.path.join(BASE_DIR, "..", "artifacts", "final_model.joblib")
 
 artifact = joblib.load(ARTIFACT_PATH)
 pipeline = artifact["pipeline"]
 THRESHOLD = artifact["threshold"]
+HISTORY_FEATURES = artifact.get("history_features", [])
 
 
 # ----------------------------
 # Prediction function
 # ----------------------------
-def predict_readmission(
+def build_record(
     age,
     gender,
     race,
@@ -65,7 +69,14 @@ def predict_readmission(
         "diag_3": diag_3,
     }
 
-    df = pd.DataFrame([record])
+    # No patient lookup here: score as a first encounter
+    if HISTORY_FEATURES:
+        record.update(EMPTY_HISTORY)
+    return record
+
+
+def predict_readmission(*inputs):
+    df = pd.DataFrame([build_record(*inputs)])
 
     prob = pipeline.predict_proba(df)[0, 1]
     if prob >= THRESHOLD:
@@ -76,6 +87,74 @@ def predict_readmission(
     return label, round(float(prob), 3), THRESHOLD
 
 
+# ----------------------------
+# What-if sensitivity
+# ----------------------------
+NUMERIC_FIELDS = [
+    "time_in_hospital",
+    "num_lab_procedures",
+    "num_procedures",
+    "num_medications",
+    "number_outpatient",
+    "number_emergency",
+    "number_inpatient",
+    "number_diagnoses",
+]
+
+CATEGORY_CHOICES = {
+    "insulin": ["No", "Up", "Down", "Steady"],
+    "diabetesMed": ["Yes", "No"],
+    "change": ["No", "Ch"],
+}
+
+
+def sweep_values(field, start, stop, steps):
+    if field in CATEGORY_CHOICES:
+        return CATEGORY_CHOICES[field]
+    return numeric_range(start, stop, int(steps))
+
+
+def what_if(
+    x_field, x_start, x_stop, x_steps, y_field, y_start, y_stop, y_steps, *inputs
+):
+    """
+    Score every variant of the patient in one batch; returns the risk
+    curve(s) and the grid as a table
+    """
+    axes = {x_field: sweep_values(x_field, x_start, x_stop, x_steps)}
+    if y_field and y_field != x_field:
+        axes[y_field] = sweep_values(y_field, y_start, y_stop, y_steps)
+
+    result = sweep(pipeline, build_record(*inputs), axes)
+    x_values = axes[x_field]
+
+    if len(axes) == 1:
+        curve = pd.DataFrame(
+            {
+                "value": x_values,
+                "probability": result["probabilities"],
+                "series": x_field,
+            }
+        )
+        table = curve[["value", "probability"]].rename(columns={"value": x_field})
+    else:
+        y_values = axes[y_field]
+        table = pd.DataFrame(
+            result["probabilities"],
+            index=pd.Index(x_values, name=x_field),
+            columns=[f"{y_field}={value}" for value in y_values],
+        ).reset_index()
+        curve = table.melt(
+            id_vars=x_field, var_name="series", value_name="probability"
+        ).rename(columns={x_field: "value"})
+
+    summary = (
+        f"Current probability {result['baseline']:.3f} "
+        f"(threshold {THRESHOLD}); {curve.shape[0]} variants scored in one batch"
+    )
+    return curve, table, summary
+
+
 # ----------------------------
 # Gradio UI
 # ----------------------------
@@ -158,39 +237,75 @@ with gr.Blocks(title="30-Day Hospital Readmission Risk Predictor") as demo:
             diag_2 = gr.Dropdown(diag_examples, label="Secondary Diagnosis (diag_2)")
             diag_3 = gr.Dropdown(diag_examples, label="Tertiary Diagnosis (diag_3)")
 
-    with gr.Row():
-        predict_btn = gr.Button("Predict Readmission Risk")
-        risk_label = gr.Textbox(label="Risk Assessment")
-        prob_out = gr.Textbox(label="Predicted Probability")
-        thresh_out = gr.Textbox(label="Decision Threshold")
+    patient_inputs = [
+        age,
+        gender,
+        race,
+        admission_type_id,
+        discharge_disposition_id,
+        admission_source_id,
+        time_in_hospital,
+        num_lab_procedures,
+        num_procedures,
+        num_medications,
+        number_outpatient,
+        number_emergency,
+        number_inpatient,
+        number_diagnoses,
+        insulin,
+        diabetesMed,
+        change,
+        diag_1,
+        diag_2,
+        diag_3,
+    ]
+
+    with gr.Tab("Predict"):
+        with gr.Row():
+            predict_btn = gr.Button("Predict Readmission Risk")
+            risk_label = gr.Textbox(label="Risk Assessment")
+            prob_out = gr.Textbox(label="Predicted Probability")
+            thresh_out = gr.Textbox(label="Decision Threshold")
+
+    with gr.Tab("What-if"):
+        sweep_fields = NUMERIC_FIELDS + list(CATEGORY_CHOICES)
+        with gr.Row():
+            x_field = gr.Dropdown(sweep_fields, value="time_in_hospital", label="Vary")
+            x_start = gr.Number(value=1, label="From")
+            x_stop = gr.Number(value=14, label="To")
+            x_steps = gr.Number(value=14, label="Steps")
+        with gr.Row():
+            y_field = gr.Dropdown(
+                [""] + sweep_fields, value="", label="And vary (optional)"
+            )
+            y_start = gr.Number(value=0, label="From")
+            y_stop = gr.Number(value=5, label="To")
+            y_steps = gr.Number(value=6, label="Steps")
+
+        sweep_btn = gr.Button("Run Sweep")
+        sweep_summary = gr.Textbox(label="Summary")
+        sweep_plot = gr.LinePlot(
+            x="value",
+            y="probability",
+            color="series",
+            y_lim=[0, 1],
+            label="Readmission risk",
+        )
+        sweep_table = gr.Dataframe(label="Probabilities")
 
     predict_btn.click(
         predict_readmission,
-        inputs=[
-            age,
-            gender,
-            race,
-            admission_type_id,
-            discharge_disposition_id,
-            admission_source_id,
-            time_in_hospital,
-            num_lab_procedures,
-            num_procedures,
-            num_medications,
-            number_outpatient,
-            number_emergency,
-            number_inpatient,
-            number_diagnoses,
-            insulin,
-            diabetesMed,
-            change,
-            diag_1,
-            diag_2,
-            diag_3,
-        ],
+        inputs=patient_inputs,
         outputs=[risk_label, prob_out, thresh_out],
     )
 
+    sweep_btn.click(
+        what_if,
+        inputs=[x_field, x_start, x_stop, x_steps, y_field, y_start, y_stop, y_steps]
+        + patient_inputs,
+        outputs=[sweep_plot, sweep_table, sweep_summary],
+    )
+
 
 if __name__ == "__main__":
     server_name = os.getenv("SERVER_NAME", "127.0.0.1")
@@ -1,12 +1,80 @@
 # app/main.py
+import contextlib
+import importlib
+import os
+import random
+import secrets
+import time
+from datetime import date, datetime, timezone
 from pathlib import Path
 
-import joblib
-import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 
+from src.inference.tiers import (
+    FALLBACK_TIER,
+    predict_proba_tier,
+    profiled_latency,
+    queue_saturated,
+    resolve_tiers,
+    tier_for_budget,
+    tier_for_load,
+)
+from src.profiling.stacks import TraceProfiler, prune_folded, write_folded
+
+# Step one tier down for every N /predict requests in flight; past the
+# cheapest tier, requests go to the logistic-regression fallback
+TIER_OVERLOAD_STEP = int(os.getenv("TIER_OVERLOAD_STEP", "8"))
+
+# Opt-in request profiling: admin header or random sampling
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", "artifacts/feature_store.sqlite")
+HISTORY_STORE_PATH = os.getenv("HISTORY_STORE_PATH", "artifacts/patient_history.sqlite")
+
+# Opt-in prediction audit log, written to Parquet off the request path
+AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR")
+AUDIT_POLICY = os.getenv("AUDIT_POLICY", "drop_newest")
+AUDIT_MAX_QUEUE = int(os.getenv("AUDIT_MAX_QUEUE", "10000"))
+
+# Imported at startup rather than on the module import path
+HEAVY_MODULES = ("pandas", "joblib", "sklearn", "xgboost")
+
+WARMUP_BATCH_SIZE = 8
+WARMUP_RECORD = {
+    "age": "[60-70)",
+    "gender": "Male",
+    "race": "Caucasian",
+    "admission_type_id": 1,
+    "discharge_disposition_id": 1,
+    "admission_source_id": 7,
+    "time_in_hospital": 3,
+    "num_lab_procedures": 45,
+    "num_procedures": 1,
+    "num_medications": 13,
+    "number_outpatient": 0,
+    "number_emergency": 0,
+    "number_inpatient": 0,
+    "number_diagnoses": 5,
+    "insulin": "No",
+    "diabetesMed": "Yes",
+    "change": "No",
+    "diag_1": "250.83",
+    "diag_2": "401.9",
+    "diag_3": "276",
+}
+
 app = FastAPI(title="Readmission Prediction API")
+app.state.in_flight = 0
+app.state.ready = False
+app.state.preloaded = False
+app.state.feature_store = None
+app.state.history_store = None
+app.state.history_features = []
+app.state.audit_sink = None
 
 
 # -----------------------------
@@ -33,25 +101,113 @@ class PatientData(BaseModel):
     diag_1: str
     diag_2: str
     diag_3: str
+    # Used to look up prior-encounter features when the model has them
+    patient_nbr: int | None = None
+    discharge_date: date | None = None
+
+
+class EncounterData(PatientData):
+    encounter_id: int
+    patient_nbr: int
+
+
+class EncounterLookup(BaseModel):
+    encounter_ids: list[int] = []
+    patient_nbr: int | None = None
+
+
+class SweepAxis(BaseModel):
+    field: str
+    # Either explicit values, or num evenly spaced from start to stop
+    values: list[int | str] = []
+    start: float | None = None
+    stop: float | None = None
+    num: int = 10
+
+
+class SensitivityRequest(BaseModel):
+    patient: PatientData
+    axes: list[SweepAxis]
+
+
+# Fields a what-if sweep may vary, with the type values are cast to
+SWEEP_FIELDS = {
+    field: annotation
+    for field, annotation in PatientData.__annotations__.items()
+    if annotation in (int, str)
+}
 
 
 # -----------------------------
 # Startup: Load Model
 # -----------------------------
-@app.on_event("startup")
-def load_artifact():
+def import_heavy_modules():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            print("⚠ Optional module not installed:", name)
+
+
+def warm_up(pipeline, tiers: dict, history_features: list):
+    """
+    Score a synthetic batch once per tier so sklearn / xgboost lazy
+    initialization happens before the first real request
+    """
+    import pandas as pd
+
+    from src.features.history import EMPTY_HISTORY
+
+    record = dict(WARMUP_RECORD)
+    if history_features:
+        record.update(EMPTY_HISTORY)
+
+    df = pd.DataFrame([record] * WARMUP_BATCH_SIZE)
+    for n_trees in set(tiers.values()):
+        predict_proba_tier(pipeline, df, n_trees)
+
+
+def preload_artifact():
+    """
+    Import the heavy modules and unpickle the artifact into app.state.
+    The pre-fork launcher (app/serve.py) calls this once in the master.
+    """
     model_path = Path("artifacts/final_model.joblib")
 
+    app.state.ready = False
+    app.state.pipeline = None
+    app.state.model_id = None
+    app.state.threshold = 0.5
+    app.state.tiers = resolve_tiers({})
+    app.state.tree_profile = []
+    app.state.history_features = []
+    app.state.fallback = None
+    app.state.startup_ms = {}
+
+    start = time.perf_counter()
+    import_heavy_modules()
+    app.state.startup_ms["imports"] = (time.perf_counter() - start) * 1000
+
     if not model_path.exists():
         print("⚠ Model file not found:", model_path)
-        app.state.pipeline = None
-        app.state.threshold = 0.5
         return
 
     try:
+        import joblib
+
+        from src.features.store import model_id
+
+        start = time.perf_counter()
         artifact = joblib.load(model_path)
+        app.state.startup_ms["unpickle"] = (time.perf_counter() - start) * 1000
+
         app.state.pipeline = artifact["pipeline"]
+        app.state.model_id = model_id(artifact, str(model_path))
         app.state.threshold = artifact.get("threshold", 0.5)
+        app.state.tiers = resolve_tiers(artifact)
+        app.state.tree_profile = artifact.get("tree_profile", [])
+        app.state.history_features = artifact.get("history_features", [])
+        app.state.fallback = artifact.get("fallback")
         print("✅ Model loaded successfully.")
     except Exception as e:
         print("❌ Model loading failed:", str(e))
@@ -59,6 +215,219 @@ def load_artifact():
         app.state.threshold = 0.5
 
 
+def open_feature_store():
+    """
+    Open the encounter feature store if it was built for this model.
+    Opened per worker: SQLite connections must not cross a fork.
+    """
+    from src.features.store import FeatureStore
+
+    app.state.feature_store = None
+
+    if app.state.model_id is None or not Path(FEATURE_STORE_PATH).exists():
+        return
+
+    store = FeatureStore(FEATURE_STORE_PATH)
+
+    if store.meta().get("model") != app.state.model_id:
+        print("⚠ Feature store built for a different model, ignoring it")
+        store.close()
+        return
+
+    app.state.feature_store = store
+    print("✅ Feature store opened:", FEATURE_STORE_PATH)
+
+
+def open_history_store():
+    """
+    Open (or create) the per-patient history state when the model uses
+    prior-encounter features. Patients missing from it score as new.
+    """
+    from src.features.history import PatientHistoryStore
+
+    app.state.history_store = None
+
+    if not app.state.history_features:
+        return
+
+    app.state.history_store = PatientHistoryStore(HISTORY_STORE_PATH)
+    print("✅ Patient history store opened:", HISTORY_STORE_PATH)
+
+
+def open_audit_sink():
+    """
+    Start the audit writer thread. Started per worker: threads do not
+    survive a fork.
+    """
+    from src.features.store import artifact_fingerprint
+    from src.inference.audit import AuditSink
+
+    app.state.audit_sink = None
+
+    if not AUDIT_LOG_DIR:
+        return
+
+    try:
+        sink = AuditSink(AUDIT_LOG_DIR, policy=AUDIT_POLICY, max_queue=AUDIT_MAX_QUEUE)
+    except (ImportError, ValueError) as e:
+        print("❌ Audit log disabled:", str(e))
+        return
+
+    app.state.model_version = artifact_fingerprint()[:12]
+    app.state.audit_sink = sink
+    print(f"✅ Audit log: {AUDIT_LOG_DIR} ({AUDIT_POLICY})")
+
+
+@app.on_event("startup")
+def load_artifact():
+    # Workers forked from a preloading master share its model pages
+    if not app.state.preloaded:
+        preload_artifact()
+
+    if app.state.pipeline is None:
+        return
+
+    open_feature_store()
+    open_history_store()
+    open_audit_sink()
+
+    try:
+        start = time.perf_counter()
+        warm_up(app.state.pipeline, app.state.tiers, app.state.history_features)
+        app.state.startup_ms["warmup"] = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        print("❌ Model warm-up failed:", str(e))
+        return
+
+    app.state.ready = True
+    print(
+        "⏱ Startup timings (ms):",
+        ", ".join(f"{k}={v:.1f}" for k, v in app.state.startup_ms.items()),
+    )
+
+
+@app.on_event("shutdown")
+def close_feature_store():
+    if app.state.feature_store is not None:
+        app.state.feature_store.close()
+        app.state.feature_store = None
+
+    if app.state.history_store is not None:
+        app.state.history_store.close()
+        app.state.history_store = None
+
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    sink = app.state.audit_sink
+    if sink is None:
+        return
+
+    app.state.audit_sink = None
+    sink.close()
+    print("✅ Audit log flushed:", sink.stats())
+
+
+# -----------------------------
+# In-flight tracking (queue pressure)
+# -----------------------------
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    if not request.url.path.startswith("/predict"):
+        return await call_next(request)
+
+    request.state.received_at = time.perf_counter()
+    app.state.in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        app.state.in_flight -= 1
+
+
+def queued_ms(request: Request) -> float:
+    """
+    Time the request has spent in the server before scoring
+    """
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is None:
+        return 0.0
+    return (time.perf_counter() - received_at) * 1000
+
+
+def choose_tier(
+    tier: str | None,
+    latency_budget_ms: float | None,
+    waited_ms: float = 0.0,
+    allow_fallback: bool = True,
+    n_rows: int = 1,
+) -> str:
+    tiers = app.state.tiers
+    profile = app.state.tree_profile
+    fallback = allow_fallback and app.state.fallback is not None
+
+    if tier is not None:
+        if tier == FALLBACK_TIER and fallback:
+            return tier
+        if tier not in tiers:
+            expected = list(tiers) + ([FALLBACK_TIER] if fallback else [])
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown tier '{tier}', expected one of {expected}",
+            )
+        return tier
+
+    if latency_budget_ms is not None:
+        # Time already spent queued counts against the budget, and the
+        # cost of a tier grows with the number of rows scored
+        remaining = latency_budget_ms - waited_ms
+        cheapest = list(tiers.values())[-1]
+        if fallback and remaining < profiled_latency(profile, cheapest, n_rows):
+            return FALLBACK_TIER
+        return tier_for_budget(tiers, profile, remaining, n_rows)
+
+    if fallback and queue_saturated(tiers, app.state.in_flight, TIER_OVERLOAD_STEP):
+        return FALLBACK_TIER
+
+    return tier_for_load(tiers, app.state.in_flight, TIER_OVERLOAD_STEP)
+
+
+# -----------------------------
+# Request profiling
+# -----------------------------
+def is_profile_admin(request: Request) -> bool:
+    token = request.headers.get("X-Profile-Token")
+    return bool(
+        token and PROFILE_TOKEN and secrets.compare_digest(token, PROFILE_TOKEN)
+    )
+
+
+def should_profile(request: Request) -> bool:
+    if is_profile_admin(request):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE  # nosec B311
+
+
+@contextlib.contextmanager
+def profiled(request: Request, response: Response, name: str):
+    """
+    Trace the wrapped block and save folded stacks under PROFILE_DIR,
+    keeping the newest PROFILE_MAX_FILES. A no-op unless the request is
+    selected for profiling; only admin-token requests get the file path.
+    """
+    if not should_profile(request):
+        yield
+        return
+
+    with TraceProfiler() as profiler:
+        yield
+
+    filename = f"{name}-{time.time_ns()}-{secrets.token_hex(4)}.folded"
+    path = write_folded(profiler.counts, os.path.join(PROFILE_DIR, filename))
+    prune_folded(PROFILE_DIR, PROFILE_MAX_FILES)
+    if is_profile_admin(request):
+        response.headers["X-Profile-Path"] = path
+
+
 # -----------------------------
 # Health Endpoint
 # -----------------------------
@@ -68,23 +437,366 @@ def health_check():
 
 
 # -----------------------------
-# Prediction Endpoint
+# Readiness Endpoint
 # -----------------------------
-@app.post("/predict")
-def predict_readmission(data: PatientData):
+@app.get("/ready")
+def readiness_check():
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Model not ready")
+
+    return {
+        "status": "ready",
+        "startup_ms": {k: round(v, 1) for k, v in app.state.startup_ms.items()},
+    }
+
+
+# -----------------------------
+# Prediction Endpoints
+# -----------------------------
+def with_history(record: dict) -> dict:
+    """
+    Add the patient's prior-encounter features when the model uses them
+    """
+    from src.features.history import EMPTY_HISTORY
+
+    if not app.state.history_features:
+        return record
+
+    store = app.state.history_store
+    if store is None:
+        return {**record, **EMPTY_HISTORY}
+    return {**record, **store.features(record.get("patient_nbr"), record)}
+
 
-    record = data.model_dump() if hasattr(data, "model_dump") else data.dict()
-    df = pd.DataFrame([record])
+def score_records(
+    records: list,
+    tier: str | None,
+    latency_budget_ms: float | None,
+    waited_ms: float = 0.0,
+):
+    """
+    Score raw records with the loaded pipeline, or the fallback when
+    shedding load; returns (probs, tier, records as scored)
+    """
+    import pandas as pd
 
     pipeline = getattr(app.state, "pipeline", None)
 
     if pipeline is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
-    prob = pipeline.predict_proba(df)[0, 1]
-    prediction = int(prob >= app.state.threshold)
+    records = [with_history(record) for record in records]
+    tier = choose_tier(tier, latency_budget_ms, waited_ms, n_rows=len(records))
+
+    if tier == FALLBACK_TIER:
+        return app.state.fallback.predict_proba(records)[:, 1], tier, records
+
+    df = pd.DataFrame(records)
+    probs = predict_proba_tier(pipeline, df, app.state.tiers[tier])[:, 1]
+    return probs, tier, records
+
+
+def decision_threshold(tier: str) -> float:
+    if tier == FALLBACK_TIER:
+        return app.state.fallback.threshold
+    return app.state.threshold
+
+
+def stored_row(encounter_id: int, X, i: int) -> dict:
+    """
+    Audit inputs for row i of a feature-store matrix: the transformed
+    values as scored (column index -> value of the stored entries for
+    sparse rows, every column for dense ones)
+    """
+    if hasattr(X, "indptr"):
+        start, end = X.indptr[i], X.indptr[i + 1]
+        return {
+            "encounter_id": encounter_id,
+            "feature_index": X.indices[start:end].tolist(),
+            "feature_value": X.data[start:end].tolist(),
+        }
+    return {"encounter_id": encounter_id, "features": X[i].tolist()}
+
+
+def audit(request: Request, endpoint: str, inputs, probs, tier, threshold):
+    """
+    Hand one audit record per prediction to the background writer;
+    inputs are the records exactly as scored, history features included
+    """
+    sink = app.state.audit_sink
+    if sink is None:
+        return
+
+    received_at = getattr(request.state, "received_at", time.perf_counter())
+    latency_ms = (time.perf_counter() - received_at) * 1000
+    timestamp = datetime.now(timezone.utc)
+
+    for record, prob in zip(inputs, probs):
+        sink.submit(
+            {
+                "timestamp": timestamp,
+                "endpoint": endpoint,
+                "model_version": app.state.model_version,
+                "tier": tier,
+                "degraded": tier == FALLBACK_TIER,
+                "threshold": threshold,
+                "probability": float(prob),
+                "prediction": int(prob >= threshold),
+                "latency_ms": latency_ms,
+                "inputs": record,
+            }
+        )
+
+
+def to_record(data: PatientData) -> dict:
+    return data.model_dump() if hasattr(data, "model_dump") else data.dict()
+
+
+@app.post("/predict")
+def predict_readmission(
+    data: PatientData,
+    request: Request,
+    response: Response,
+    tier: str | None = None,
+    latency_budget_ms: float | None = None,
+):
+    waited_ms = queued_ms(request)
+
+    with profiled(request, response, "predict"):
+        records = [to_record(data)]
+        probs, tier, records = score_records(
+            records, tier, latency_budget_ms, waited_ms
+        )
+        threshold = decision_threshold(tier)
+        prob = probs[0]
+        prediction = int(prob >= threshold)
+
+    audit(request, "/predict", records, probs, tier, threshold)
 
     return {
         "readmission_probability": round(float(prob), 4),
         "prediction": prediction,
+        "tier": tier,
+        "degraded": tier == FALLBACK_TIER,
     }
+
+
+@app.post("/predict/batch")
+def predict_readmission_batch(
+    data: list[PatientData],
+    request: Request,
+    response: Response,
+    tier: str | None = None,
+    latency_budget_ms: float | None = None,
+):
+    if not data:
+        raise HTTPException(status_code=422, detail="Empty batch")
+
+    waited_ms = queued_ms(request)
+
+    with profiled(request, response, "predict-batch"):
+        records = [to_record(item) for item in data]
+        probs, tier, records = score_records(
+            records, tier, latency_budget_ms, waited_ms
+        )
+        threshold = decision_threshold(tier)
+
+    audit(request, "/predict/batch", records, probs, tier, threshold)
+
+    return {
+        "predictions": [
+            {
+                "readmission_probability": round(float(prob), 4),
+                "prediction": int(prob >= threshold),
+            }
+            for prob in probs
+        ],
+        "tier": tier,
+        "degraded": tier == FALLBACK_TIER,
+    }
+
+
+def sweep_axes(axes: list) -> dict:
+    """
+    {field: values} for the requested axes, values cast to field type
+    """
+    from src.inference.sensitivity import MAX_GRID_SIZE, numeric_range
+
+    result = {}
+    for axis in axes:
+        cast = SWEEP_FIELDS.get(axis.field)
+        if cast is None:
+            raise HTTPException(
+                status_code=422, detail=f"Field '{axis.field}' cannot be swept"
+            )
+        if axis.field in result:
+            raise HTTPException(
+                status_code=422, detail=f"Field '{axis.field}' given twice"
+            )
+
+        if axis.values:
+            try:
+                result[axis.field] = [cast(value) for value in axis.values]
+            except ValueError:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Values for '{axis.field}' must be {cast.__name__}",
+                )
+        elif cast is int and axis.start is not None and axis.stop is not None:
+            if not 1 <= axis.num <= MAX_GRID_SIZE:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Axis '{axis.field}' num must be 1..{MAX_GRID_SIZE}",
+                )
+            result[axis.field] = numeric_range(axis.start, axis.stop, axis.num)
+        else:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Axis '{axis.field}' needs values or a numeric start / stop",
+            )
+    return result
+
+
+@app.post("/predict/sensitivity")
+def predict_sensitivity(
+    body: SensitivityRequest,
+    request: Request,
+    response: Response,
+    tier: str | None = None,
+):
+    from src.inference.sensitivity import sweep
+
+    pipeline = getattr(app.state, "pipeline", None)
+
+    if pipeline is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    axes = sweep_axes(body.axes)
+    if not axes:
+        raise HTTPException(status_code=422, detail="No sweep axes given")
+
+    # The whole grid is one batch, so the booster is always used
+    tier = choose_tier(tier, None, allow_fallback=False)
+    record = with_history(to_record(body.patient))
+
+    with profiled(request, response, "predict-sensitivity"):
+        try:
+            result = sweep(pipeline, record, axes, app.state.tiers[tier])
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    # One summary record per sweep: the unchanged record and the axes
+    audit(
+        request,
+        "/predict/sensitivity",
+        [dict(record, sweep_axes=axes)],
+        [result["baseline"]],
+        tier,
+        app.state.threshold,
+    )
+
+    return {
+        "fields": list(axes),
+        "values": list(axes.values()),
+        "probabilities": result["probabilities"],
+        "baseline_probability": round(result["baseline"], 4),
+        "threshold": app.state.threshold,
+        "tier": tier,
+    }
+
+
+# -----------------------------
+# Feature Store Endpoints
+# -----------------------------
+def get_feature_store():
+    store = app.state.feature_store
+
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store not loaded")
+    return store
+
+
+@app.post("/predict/by-id")
+def predict_by_id(
+    lookup: EncounterLookup,
+    request: Request,
+    response: Response,
+    tier: str | None = None,
+    latency_budget_ms: float | None = None,
+):
+    waited_ms = queued_ms(request)
+    store = get_feature_store()
+
+    ids = list(lookup.encounter_ids)
+    if lookup.patient_nbr is not None:
+        ids += store.encounters_for_patient(lookup.patient_nbr)
+    if not ids:
+        raise HTTPException(status_code=422, detail="No encounter ids given")
+
+    with profiled(request, response, "predict-by-id"):
+        found, X = store.get(ids)
+        if not found:
+            raise HTTPException(status_code=404, detail="Unknown encounter ids")
+
+        # Rows are already preprocessed: score them with the booster only
+        model = app.state.pipeline.named_steps["model"]
+        # The fallback scores raw fields, which stored rows no longer have
+        tier = choose_tier(
+            tier,
+            latency_budget_ms,
+            waited_ms,
+            allow_fallback=False,
+            n_rows=len(found),
+        )
+        probs = predict_proba_tier(model, X, app.state.tiers[tier])[:, 1]
+
+    # Generated only if the audit log consumes them
+    inputs = (stored_row(encounter_id, X, i) for i, encounter_id in enumerate(found))
+    audit(request, "/predict/by-id", inputs, probs, tier, app.state.threshold)
+
+    return {
+        "predictions": [
+            {
+                "encounter_id": encounter_id,
+                "readmission_probability": round(float(prob), 4),
+                "prediction": int(prob >= app.state.threshold),
+            }
+            for encounter_id, prob in zip(found, probs)
+        ],
+        "missing": sorted(set(ids) - set(found)),
+        "tier": tier,
+    }
+
+
+@app.post("/encounters")
+def upsert_encounters(data: list[EncounterData]):
+    import pandas as pd
+
+    from src.features.store import featurize
+
+    store = get_feature_store()
+    history = app.state.history_store
+
+    records = [to_record(item) for item in data]
+    if not records:
+        raise HTTPException(status_code=422, detail="No encounters given")
+
+    # History is computed and recorded in one transaction that commits
+    # only once the feature rows are saved. Each encounter sees the ones
+    # before it; a re-sent encounter_id gets its first recorded history.
+    recording = contextlib.nullcontext()
+    if history is not None:
+        recording = history.recording(records)
+
+    with recording as features:
+        if features is None:
+            records = [with_history(record) for record in records]
+        else:
+            records = [{**record, **extra} for record, extra in zip(records, features)]
+
+        df = pd.DataFrame(records)
+        X = featurize(app.state.pipeline, df)
+        count = store.upsert(
+            df["encounter_id"], df["patient_nbr"], X, app.state.model_id
+        )
+    return {"upserted": count}
@@ -0,0 +1,275 @@
+# app/serve.py
+"""
+Pre-fork launcher for app.main:app.
+
+The master imports and unpickles the model once, freezes it for the
+garbage collector and then forks the workers, so every worker shares
+the model pages copy-on-write instead of holding its own copy.
+
+    python -m app.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from collections import deque
+
+import uvicorn
+
+from app.main import app, preload_artifact
+
+SMAPS_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_kb",
+    "Shared_Dirty": "shared_kb",
+    "Private_Clean": "unique_kb",
+    "Private_Dirty": "unique_kb",
+}
+
+
+# -----------------------------
+# Memory reporting
+# -----------------------------
+def read_memory(pid: int) -> dict:
+    """
+    RSS / PSS / unique (private) / shared memory of a process in kB,
+    read from /proc/<pid>/smaps_rollup (Linux only)
+    """
+    usage = {"pid": pid, "rss_kb": 0, "pss_kb": 0, "unique_kb": 0, "shared_kb": 0}
+
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                usage[SMAPS_FIELDS[key]] += int(rest.split()[0])
+
+    return usage
+
+
+def memory_report(master_pid: int, worker_pids: list) -> list:
+    rows = [dict(read_memory(master_pid), role="master")]
+    for pid in worker_pids:
+        try:
+            rows.append(dict(read_memory(pid), role="worker"))
+        except FileNotFoundError:
+            continue
+    return rows
+
+
+def print_memory_report(rows: list):
+    print("\nRole   |    PID | RSS (MB) | PSS (MB) | Unique (MB) | Shared (MB)")
+    print("------------------------------------------------------------------")
+    for row in rows:
+        print(
+            f"{row['role']:6s} | {row['pid']:6d} | {row['rss_kb'] / 1024:8.1f} "
+            f"| {row['pss_kb'] / 1024:8.1f} | {row['unique_kb'] / 1024:11.1f} "
+            f"| {row['shared_kb'] / 1024:11.1f}"
+        )
+    total_pss = sum(row["pss_kb"] for row in rows) / 1024
+    print(f"Total PSS: {total_pss:.1f} MB\n")
+
+
+# -----------------------------
+# Pre-fork master / workers
+# -----------------------------
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, log_level: str):
+    # The model is already in app.state; the startup hook only warms it up
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        code = 1
+        try:
+            run_worker(sock, log_level)
+            code = 0
+        except BaseException:
+            # os._exit() skips the interpreter's own traceback printing
+            traceback.print_exc()
+        finally:
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+
+class RestartLimiter:
+    """
+    Back off exponentially from backoff_s (capped at max_backoff_s) while
+    workers keep exiting, and give up after max_restarts restarts within
+    window_s, so a worker that can't start isn't re-forked forever
+    """
+
+    def __init__(
+        self,
+        max_restarts: int = 5,
+        window_s: float = 60.0,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+    ):
+        self.max_restarts = max_restarts
+        self.window_s = window_s
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._restarts = deque()
+
+    def next_delay(self, now: float):
+        """
+        Seconds to wait before the next restart, or None to give up
+        """
+        while self._restarts and now - self._restarts[0] > self.window_s:
+            self._restarts.popleft()
+        if len(self._restarts) >= self.max_restarts:
+            return None
+
+        delay = min(self.backoff_s * 2 ** len(self._restarts), self.max_backoff_s)
+        self._restarts.append(now + delay)
+        return delay
+
+
+def supervise(spawn, n_workers: int, limiter: RestartLimiter, report_after=0.0):
+    """
+    Fork n_workers with spawn() and restart those that exit until
+    SIGINT / SIGTERM; returns 1 if the limiter gave up, else 0
+    """
+    workers = [spawn() for _ in range(n_workers)]
+    restarts = []  # monotonic times at which to spawn a replacement
+    stopping = False
+    code = 0
+
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        restarts.clear()
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report(signum=None, frame=None):
+        print_memory_report(memory_report(os.getpid(), workers))
+
+    previous = {
+        signum: signal.signal(signum, handler)
+        for signum, handler in (
+            (signal.SIGINT, stop),
+            (signal.SIGTERM, stop),
+            (signal.SIGUSR1, report),
+        )
+    }
+    report_at = time.monotonic() + report_after if report_after else None
+
+    try:
+        while workers or restarts:
+            now = time.monotonic()
+            if report_at is not None and now >= report_at:
+                report()
+                report_at = None
+
+            while restarts and restarts[0] <= now:
+                restarts.pop(0)
+                workers.append(spawn())
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG) if workers else (0, 0)
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            if pid == 0:
+                wait = min([0.5] + [at - now for at in restarts])
+                time.sleep(max(wait, 0.0))
+                continue
+
+            workers.remove(pid)
+            if stopping:
+                continue
+
+            delay = limiter.next_delay(time.monotonic())
+            if delay is None:
+                print(
+                    f"❌ Worker {pid} exited after {limiter.max_restarts} restarts "
+                    f"within {limiter.window_s:.0f} s, shutting down"
+                )
+                code = 1
+                stop()
+                continue
+
+            print(
+                f"⚠ Worker {pid} exited (status {os.waitstatus_to_exitcode(status)}), "
+                f"restarting in {delay:.1f} s"
+            )
+            restarts.append(time.monotonic() + delay)
+            restarts.sort()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    return code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "4")))
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument(
+        "--report-after",
+        type=float,
+        default=10.0,
+        help="print a memory report this many seconds after forking (0: off)",
+    )
+    parser.add_argument(
+        "--max-restarts",
+        type=int,
+        default=5,
+        help="give up when workers exit this often within --restart-window",
+    )
+    parser.add_argument("--restart-window", type=float, default=60.0, help="seconds")
+    args = parser.parse_args(argv)
+
+    preload_artifact()
+    app.state.preloaded = True
+
+    # Move everything loaded so far into the permanent generation so
+    # collections in the workers never write to (and copy) those pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.workers} workers")
+
+    code = supervise(
+        lambda: spawn_worker(sock, args.log_level),
+        args.workers,
+        RestartLimiter(args.max_restarts, args.restart_window),
+        args.report_after,
+    )
+
+    sock.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
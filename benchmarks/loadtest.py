@@ -0,0 +1,320 @@
+# benchmarks/loadtest.py
+"""
+In-process load test for app.main:app with a latency SLO regression gate.
+
+Starts the API on a local port in a background thread, drives it with
+synthetic PatientData payloads from asyncio at several concurrency
+levels and request mixes, and reports throughput and p50/p95/p99
+latency. Client and server share one interpreter, so absolute numbers
+are a lower bound; compare runs on the same box.
+
+    python -m benchmarks.loadtest                      # gate on baseline
+    python -m benchmarks.loadtest --save-baseline      # record baseline
+    python -m benchmarks.loadtest --tier auto          # let the server shed load
+
+Requests pin `--tier` (default "full") so the server can't trade quality
+for latency behind the gate's back; with "auto" the served tiers and
+degraded (fallback) responses are counted and gated as well.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+import uvicorn
+
+from app.main import app
+from src.inference.tiers import FALLBACK_TIER
+
+BASELINE_PATH = "benchmarks/loadtest_baseline.json"
+
+# Share of single-record requests; the rest go to /predict/batch
+MIXES = {"single": 1.0, "batch": 0.0, "mixed": 0.9}
+
+CHOICES = {
+    "age": [f"[{i * 10}-{i * 10 + 10})" for i in range(10)],
+    "gender": ["Male", "Female"],
+    "race": ["Caucasian", "AfricanAmerican", "Asian", "Hispanic", "Other", "?"],
+    "admission_type_id": [1, 2, 3, 5, 6],
+    "discharge_disposition_id": [1, 2, 3, 6, 11, 18],
+    "admission_source_id": [1, 2, 4, 7, 17],
+    "insulin": ["No", "Up", "Down", "Steady"],
+    "diabetesMed": ["Yes", "No"],
+    "change": ["No", "Ch"],
+    "diag_1": ["250.83", "428", "410", "414", "486", "786", "V45", "996"],
+    "diag_2": ["401.9", "428", "250", "276", "427", "V58"],
+    "diag_3": ["276", "401", "250", "414", "272", "E878"],
+}
+RANGES = {
+    "time_in_hospital": (1, 14),
+    "num_lab_procedures": (1, 100),
+    "num_procedures": (0, 6),
+    "num_medications": (1, 60),
+    "number_outpatient": (0, 5),
+    "number_emergency": (0, 3),
+    "number_inpatient": (0, 5),
+    "number_diagnoses": (1, 16),
+}
+
+
+def synthetic_patient(rng: random.Random) -> dict:
+    record = {field: rng.choice(values) for field, values in CHOICES.items()}
+    record.update({field: rng.randint(lo, hi) for field, (lo, hi) in RANGES.items()})
+    return record
+
+
+# -----------------------------
+# Local server
+# -----------------------------
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+
+    deadline = time.monotonic() + 60
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("API did not start")
+        time.sleep(0.05)
+
+    if not app.state.ready:
+        raise RuntimeError("API started but the model is not ready")
+    return server
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+async def drive(
+    base_url,
+    concurrency,
+    single_share,
+    batch_size,
+    duration,
+    warmup,
+    seed,
+    tier="full",
+):
+    """
+    Run `concurrency` closed-loop users for warmup + duration seconds;
+    only requests started after the warm-up are measured. tier="auto"
+    leaves the tier to the server.
+    """
+    rng = random.Random(seed)
+    payloads = [synthetic_patient(rng) for _ in range(512)]
+    params = {} if tier == "auto" else {"tier": tier}
+    latencies = []
+    served = Counter()
+    degraded = 0
+    records = 0
+    errors = 0
+
+    async def user(client):
+        nonlocal records, errors, degraded
+        while time.perf_counter() < stop_at:
+            if rng.random() < single_share:
+                url, body, n = "/predict", rng.choice(payloads), 1
+            else:
+                url, n = "/predict/batch", batch_size
+                body = rng.sample(payloads, batch_size)
+
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=body, params=params)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if start < measure_from:
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            if ok:
+                records += n
+                result = response.json()
+                served[result["tier"]] += 1
+                degraded += bool(result.get("degraded"))
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30
+    ) as client:
+        measure_from = time.perf_counter() + warmup
+        stop_at = measure_from + duration
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - measure_from
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests_per_s": len(latencies) / elapsed,
+        "records_per_s": records / elapsed,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "errors": errors,
+        "tier": tier,
+        "tiers": dict(served),
+        "degraded": degraded,
+    }
+
+
+# -----------------------------
+# Regression gate
+# -----------------------------
+def served(result: dict) -> str:
+    return " ".join(f"{name}:{n}" for name, n in sorted(result["tiers"].items()))
+
+
+def tier_shares(result: dict) -> dict:
+    total = sum(result.get("tiers", {}).values())
+    return {name: n / total for name, n in result.get("tiers", {}).items() if total}
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Scenarios whose throughput dropped, or whose p95 / p99 grew,
+    by more than `tolerance` (a fraction) against the baseline, or
+    that were served by other tiers than the baseline
+    """
+    failures = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if base.get("tier") != result["tier"]:
+            failures.append(
+                f"{scenario}: baseline recorded with tier {base.get('tier')}, "
+                f"run with {result['tier']} (re-record with --save-baseline)"
+            )
+            continue
+        if result["errors"]:
+            failures.append(f"{scenario}: {result['errors']} failed requests")
+        if result["degraded"] and result["tier"] != FALLBACK_TIER:
+            failures.append(
+                f"{scenario}: {result['degraded']} responses degraded to the fallback"
+            )
+
+        shares, base_shares = tier_shares(result), tier_shares(base)
+        for name in sorted(set(shares) | set(base_shares)):
+            share, base_share = shares.get(name, 0.0), base_shares.get(name, 0.0)
+            if abs(share - base_share) > tolerance:
+                failures.append(
+                    f"{scenario}: tier {name} served {share:.0%} "
+                    f"vs baseline {base_share:.0%}"
+                )
+
+        if result["requests_per_s"] < base["requests_per_s"] * (1 - tolerance):
+            failures.append(
+                f"{scenario}: throughput {result['requests_per_s']:.1f}/s "
+                f"< baseline {base['requests_per_s']:.1f}/s"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            if result[key] > base[key] * (1 + tolerance):
+                failures.append(
+                    f"{scenario}: {key} {result[key]:.1f} > baseline {base[key]:.1f}"
+                )
+    return failures
+
+
+HEADER = (
+    "Scenario         | Req/s  | Records/s | p50 (ms) | p95 (ms) | p99 (ms) | Tiers"
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--mix", nargs="+", default=list(MIXES), choices=list(MIXES))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds each")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--tier", default="full", help='tier to request, or "auto" for the server\'s'
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Without a baseline there is nothing to gate on: fail before the run
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print("❌ No baseline at", args.baseline, "- run with --save-baseline")
+        return 1
+
+    port = free_port()
+    server = start_server(port)
+
+    results = {}
+    print(f"Requested tier: {args.tier}")
+    print(HEADER)
+    print("-" * len(HEADER))
+    try:
+        for mix in args.mix:
+            for concurrency in args.concurrency:
+                scenario = f"{mix}@{concurrency}"
+                result = asyncio.run(
+                    drive(
+                        f"http://127.0.0.1:{port}",
+                        concurrency,
+                        MIXES[mix],
+                        args.batch_size,
+                        args.duration,
+                        args.warmup,
+                        args.seed,
+                        args.tier,
+                    )
+                )
+                results[scenario] = result
+                print(
+                    f"{scenario:16s} | {result['requests_per_s']:6.1f} "
+                    f"| {result['records_per_s']:9.1f} | {result['p50_ms']:8.1f} "
+                    f"| {result['p95_ms']:8.1f} | {result['p99_ms']:8.1f} "
+                    f"| {served(result)}"
+                )
+    finally:
+        server.should_exit = True
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("\nBaseline saved to", args.baseline)
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print("\n❌ No baseline at", args.baseline, "- run with --save-baseline")
+        return 1
+
+    failures = regressions(results, baseline, args.tolerance)
+    if failures:
+        print(f"\n❌ SLO regression (tolerance {args.tolerance:.0%}):")
+        for failure in failures:
+            print("  -", failure)
+        return 1
+
+    print(f"\n✅ Within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
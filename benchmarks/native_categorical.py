@@ -0,0 +1,82 @@
+# benchmarks/native_categorical.py
+"""
+One-hot vs native categorical XGBoost on the processed train / test
+split: training time, inference latency, artifact size and ROC-AUC.
+
+    python -m benchmarks.native_categorical
+    python -m benchmarks.native_categorical --n-estimators 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+from sklearn.metrics import roc_auc_score
+
+from models.train_final_model import (
+    PROFILE_BATCH_SIZE,
+    build_model_pipeline,
+    load_split,
+    median_latency_ms,
+)
+from src.features.preprocessing import ENCODINGS
+
+
+def artifact_size_mb(pipeline) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.joblib")
+        joblib.dump({"pipeline": pipeline}, path)
+        return os.path.getsize(path) / 1e6
+
+
+def measure(encoding, split, n_estimators=None, repeats=30) -> dict:
+    X_train, y_train, X_test, y_test = split
+
+    pipeline = build_model_pipeline(encoding)
+    if n_estimators is not None:
+        pipeline.set_params(model__n_estimators=n_estimators)
+
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    train_s = time.perf_counter() - start
+
+    single = X_test.iloc[[0]]
+    batch = X_test.sample(n=min(PROFILE_BATCH_SIZE, len(X_test)), random_state=42)
+    probs = pipeline.predict_proba(X_test)[:, 1]
+
+    return {
+        "n_features": pipeline.named_steps["model"].n_features_in_,
+        "train_s": train_s,
+        "latency_ms": median_latency_ms(pipeline, single, None, repeats),
+        "batch_latency_ms": median_latency_ms(pipeline, batch, None, repeats),
+        "artifact_mb": artifact_size_mb(pipeline),
+        "roc_auc": float(roc_auc_score(y_test, probs)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-estimators", type=int, help="override XGB_PARAMS")
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    split = load_split()
+
+    print(
+        "Encoding | Features | Train (s) | Latency (ms) "
+        "| Batch latency (ms) | Artifact (MB) | ROC-AUC"
+    )
+    print("-" * 92)
+    for encoding in ENCODINGS:
+        result = measure(encoding, split, args.n_estimators, args.repeats)
+        print(
+            f"{encoding:8s} | {result['n_features']:8d} | {result['train_s']:9.1f} "
+            f"| {result['latency_ms']:12.2f} | {result['batch_latency_ms']:18.2f} "
+            f"| {result['artifact_mb']:13.2f} | {result['roc_auc']:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/serve_memory.py
+"""
+Resident memory of the API at several worker counts: the pre-fork
+launcher (app/serve.py) against plain `uvicorn --workers`.
+
+    python -m benchmarks.serve_memory --workers 1 4 8
+"""
+
+import argparse
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+import urllib.request
+
+from app.main import WARMUP_RECORD
+from app.serve import read_memory
+
+STARTUP_MARKER = "Startup timings"
+
+
+def descendants(pid: int) -> list:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            for child in f.read().split():
+                children.append(int(child))
+                children.extend(descendants(int(child)))
+    return children
+
+
+def command(mode: str, workers: int, port: int) -> list:
+    if mode == "preload":
+        return [
+            sys.executable,
+            "-m",
+            "app.serve",
+            "--workers",
+            str(workers),
+            "--port",
+            str(port),
+            "--report-after",
+            "0",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--workers",
+        str(workers),
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+
+
+def send_requests(port: int, n: int):
+    body = json.dumps(WARMUP_RECORD).encode()
+    for _ in range(n):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/predict",
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:  # nosec B310
+            response.read()
+
+
+def measure(mode: str, workers: int, port: int, timeout: float = 120.0) -> dict:
+    with tempfile.TemporaryFile(mode="w+") as log:
+        proc = subprocess.Popen(  # nosec B603
+            command(mode, workers, port),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env=dict(os.environ, PYTHONWARNINGS="ignore"),
+        )
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                log.seek(0)
+                if log.read().count(STARTUP_MARKER) >= workers:
+                    break
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise RuntimeError(f"{mode} x{workers} did not start")
+                time.sleep(0.5)
+
+            send_requests(port, 20 * workers)
+            time.sleep(1.0)
+
+            master = read_memory(proc.pid)
+            children = [read_memory(pid) for pid in descendants(proc.pid)]
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    rows = [master] + children
+    if mode == "uvicorn" and workers == 1:
+        # uvicorn serves a single worker in the master process
+        worker_rows = [master]
+    else:
+        # The master is excluded by PID; the workers are its heaviest
+        # descendants (uvicorn also starts small helper processes)
+        children.sort(key=lambda row: row["rss_kb"], reverse=True)
+        worker_rows = children[:workers]
+    return {
+        "mode": mode,
+        "workers": workers,
+        "total_pss_mb": sum(row["pss_kb"] for row in rows) / 1024,
+        "worker_unique_mb": sum(r["unique_kb"] for r in worker_rows)
+        / len(worker_rows)
+        / 1024,
+        "worker_shared_mb": sum(r["shared_kb"] for r in worker_rows)
+        / len(worker_rows)
+        / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(
+        "Mode    | Workers | Total PSS (MB) "
+        "| Unique/worker (MB) | Shared/worker (MB)"
+    )
+    print("--------------------------------------------------------------------------")
+    for workers in args.workers:
+        for mode in ("uvicorn", "preload"):
+            result = measure(mode, workers, args.port)
+            print(
+                f"{result['mode']:7s} | {result['workers']:7d} "
+                f"| {result['total_pss_mb']:14.1f} "
+                f"| {result['worker_unique_mb']:18.1f} "
+                f"| {result['worker_shared_mb']:18.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
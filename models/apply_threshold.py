@@ -0,0 +1,27 @@
+# src/models/apply_threshold.py
+
+import joblib
+
+from models.params import FINAL_THRESHOLD
+
+ARTIFACT_PATH = "artifacts/final_model.joblib"
+
+
+def main():
+    """
+    Stamp FINAL_THRESHOLD into the saved artifact without refitting
+    """
+    artifact = joblib.load(ARTIFACT_PATH)
+
+    if artifact.get("threshold") == FINAL_THRESHOLD:
+        print("Threshold already", FINAL_THRESHOLD)
+        return
+
+    artifact["threshold"] = FINAL_THRESHOLD
+    joblib.dump(artifact, ARTIFACT_PATH)
+
+    print("Artifact threshold set to", FINAL_THRESHOLD)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import os
-
 import joblib
 import pandas as pd
 from sklearn.metrics import (
@@ -12,48 +10,24 @@ from sklearn.metrics import (
     recall_score,
     roc_auc_score,
 )
-from sklearn.model_selection import train_test_split
+
+from src.features.history import add_history_features
 
 
 def main():
 
     print("\n===== FINAL MODEL EVALUATION =====\n")
 
-    # -----------------------------
-    # Resolve base directory
-    # -----------------------------
-    BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-
-    data_path = os.path.join(BASE_DIR, "data", "raw", "diabetic_data.csv")
-    artifact_path = os.path.join(BASE_DIR, "artifacts", "final_model.joblib")
+    data_path = "data/processed/test.parquet"
+    artifact_path = "artifacts/final_model.joblib"
 
-    print("Loading raw dataset from:", data_path)
+    print("Loading test split from:", data_path)
     print("Loading model from:", artifact_path)
 
     # -----------------------------
-    # Load raw dataset
+    # Load the patient-level test split used in training
     # -----------------------------
-    df = pd.read_csv(data_path)
-
-    # -----------------------------
-    # Create binary target
-    # -----------------------------
-    df["readmitted_binary"] = (df["readmitted"] == "<30").astype(int)
-
-    # -----------------------------
-    # Drop leakage / unused columns
-    # -----------------------------
-    df = df.drop(columns=["encounter_id"])
-
-    # -----------------------------
-    # Recreate same split as training
-    # -----------------------------
-    train_df, test_df = train_test_split(
-        df, test_size=0.2, random_state=42, stratify=df["readmitted_binary"]
-    )
-
-    X_test = test_df.drop(columns=["readmitted", "readmitted_binary"])
-    y_test = test_df["readmitted_binary"]
+    test_df = pd.read_parquet(data_path)
 
     # -----------------------------
     # Load trained pipeline
@@ -62,6 +36,12 @@ def main():
     pipeline = artifact["pipeline"]
     threshold = artifact["threshold"]
 
+    if artifact.get("history_features"):
+        test_df = add_history_features(test_df)
+
+    X_test = test_df.drop(columns=["readmitted", "readmitted_binary", "patient_nbr"])
+    y_test = test_df["readmitted_binary"]
+
     # -----------------------------
     # Predict
     # -----------------------------
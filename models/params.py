@@ -0,0 +1,25 @@
+# src/models/params.py
+
+# 🔐 Best params from Optuna
+XGB_PARAMS = {
+    "n_estimators": 571,
+    "max_depth": 6,
+    "learning_rate": 0.017747030784529255,
+    "subsample": 0.6779109723647712,
+    "colsample_bytree": 0.8392168209257673,
+    "min_child_weight": 3,
+    "reg_alpha": 3.1353690038478406,
+    "reg_lambda": 4.981120484534052,
+    "scale_pos_weight": 7.87,
+    "eval_metric": "auc",
+    "tree_method": "hist",
+}
+
+FINAL_THRESHOLD = 0.45
+
+# Prior-utilization features from src/features/history.py
+USE_HISTORY_FEATURES = True
+
+# Categorical encoding for the final model: "onehot" or "native"
+# (see benchmarks/native_categorical.py)
+ENCODING = "onehot"
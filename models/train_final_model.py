@@ -1,49 +1,172 @@
 # src/models/train_final_model.py
 
+import argparse
+import os
+import time
+
 import joblib
+import numpy as np
 import pandas as pd
+from sklearn.metrics import roc_auc_score
 from sklearn.pipeline import Pipeline
 from xgboost import XGBClassifier
 
-from src.features.preprocessing import build_preprocessing_pipeline
+from models.params import ENCODING, FINAL_THRESHOLD, USE_HISTORY_FEATURES, XGB_PARAMS
+from src.features.history import HISTORY_FEATURES, add_history_features
+from src.features.preprocessing import (
+    ENCODINGS,
+    build_preprocessing_pipeline,
+    native_feature_types,
+)
+from src.inference.tiers import FULL_TIER, predict_proba_tier
+
+BASELINE_PATH = "artifacts/baseline_model.joblib"
+
+# Tree counts at which AUC / latency are profiled
+PROFILE_CHECKPOINTS = [25, 50, 100, 150, 200, 300, 400, 500]
+PROFILE_BATCH_SIZE = 256
+PROFILE_REPEATS = 30
+
+# Cheaper tiers: fewest trees whose AUC stays within tolerance of full
+TIER_AUC_TOLERANCES = {"balanced": 0.002, "fast": 0.01}
+
+
+def build_model_pipeline(encoding=ENCODING, history=USE_HISTORY_FEATURES):
+    """
+    Preprocessing + XGBClassifier; "native" encoding feeds category codes
+    to the booster's categorical splits instead of one-hot columns
+    """
+    params = dict(XGB_PARAMS)
+    if encoding == "native":
+        params.update(
+            enable_categorical=True,
+            feature_types=native_feature_types(history),
+        )
 
-FINAL_THRESHOLD = 0.45
+    return Pipeline(
+        [
+            ("preprocessing", build_preprocessing_pipeline(history, encoding)),
+            ("model", XGBClassifier(**params)),
+        ]
+    )
 
 
-def main():
+def load_split():
+    """
+    (X_train, y_train, X_test, y_test) from the processed parquet files
+    """
     train_df = pd.read_parquet("data/processed/train.parquet")
+    test_df = pd.read_parquet("data/processed/test.parquet")
+
+    if USE_HISTORY_FEATURES:
+        train_df = add_history_features(train_df)
+        test_df = add_history_features(test_df)
 
-    X_train = train_df.drop(columns=["readmitted", "readmitted_binary", "patient_nbr"])
-    y_train = train_df["readmitted_binary"]
-
-    best_params = {
-        "n_estimators": 571,
-        "max_depth": 6,
-        "learning_rate": 0.017747030784529255,
-        "subsample": 0.6779109723647712,
-        "colsample_bytree": 0.8392168209257673,
-        "min_child_weight": 3,
-        "reg_alpha": 3.1353690038478406,
-        "reg_lambda": 4.981120484534052,
-        "scale_pos_weight": 7.87,
-        "eval_metric": "auc",
-        "tree_method": "hist",
-    }
-
-    model = XGBClassifier(**best_params)
-
-    pipeline = Pipeline(
-        [("preprocessing", build_preprocessing_pipeline()), ("model", model)]
+    drop = ["readmitted", "readmitted_binary", "patient_nbr"]
+    return (
+        train_df.drop(columns=drop),
+        train_df["readmitted_binary"],
+        test_df.drop(columns=drop),
+        test_df["readmitted_binary"],
     )
 
+
+def median_latency_ms(pipeline, df, n_trees, repeats=PROFILE_REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_proba_tier(pipeline, df, n_trees)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def profile_tree_counts(pipeline, X_test, y_test):
+    """
+    ROC-AUC and latency (single row + batch) against number of trees
+    """
+    n_total = pipeline.named_steps["model"].get_booster().num_boosted_rounds()
+    checkpoints = [n for n in PROFILE_CHECKPOINTS if n < n_total] + [n_total]
+
+    single = X_test.iloc[[0]]
+    batch = X_test.sample(n=min(PROFILE_BATCH_SIZE, len(X_test)), random_state=42)
+
+    profile = []
+    for n_trees in checkpoints:
+        probs = predict_proba_tier(pipeline, X_test, n_trees)[:, 1]
+        profile.append(
+            {
+                "n_trees": n_trees,
+                "roc_auc": float(roc_auc_score(y_test, probs)),
+                "latency_ms": median_latency_ms(pipeline, single, n_trees),
+                "batch_latency_ms": median_latency_ms(pipeline, batch, n_trees),
+                "batch_size": len(batch),
+            }
+        )
+    return profile
+
+
+def select_tiers(profile):
+    full = profile[-1]
+    tiers = {FULL_TIER: full["n_trees"]}
+    for name, tolerance in TIER_AUC_TOLERANCES.items():
+        eligible = [
+            row for row in profile if row["roc_auc"] >= full["roc_auc"] - tolerance
+        ]
+        tiers[name] = min(row["n_trees"] for row in eligible)
+    return tiers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the final model")
+    parser.add_argument("--encoding", choices=ENCODINGS, default=ENCODING)
+    args = parser.parse_args(argv)
+
+    X_train, y_train, X_test, y_test = load_split()
+
+    pipeline = build_model_pipeline(args.encoding)
     pipeline.fit(X_train, y_train)
 
+    # -----------------------------
+    # AUC / latency vs number of trees
+    # -----------------------------
+    profile = profile_tree_counts(pipeline, X_test, y_test)
+    tiers = select_tiers(profile)
+
+    print("\nTrees | ROC-AUC | Latency (ms) | Batch latency (ms)")
+    print("----------------------------------------------------")
+    for row in profile:
+        print(
+            f"{row['n_trees']:5d} | {row['roc_auc']:.4f}  "
+            f"| {row['latency_ms']:12.2f} | {row['batch_latency_ms']:.2f}"
+        )
+    print("Tiers:", tiers)
+
+    # Compiled LR from models/train_baseline.py, served when shedding load
+    fallback = None
+    if os.path.exists(BASELINE_PATH):
+        fallback = joblib.load(BASELINE_PATH)["scorer"]
+    else:
+        print("⚠ No baseline model, saving without a fallback:", BASELINE_PATH)
+
     joblib.dump(
-        {"pipeline": pipeline, "threshold": FINAL_THRESHOLD},
+        {
+            "pipeline": pipeline,
+            # Keys the feature store; kept when only the threshold changes
+            "model_id": joblib.hash(pipeline),
+            "threshold": FINAL_THRESHOLD,
+            "tree_profile": profile,
+            "tiers": tiers,
+            "history_features": HISTORY_FEATURES if USE_HISTORY_FEATURES else [],
+            "encoding": args.encoding,
+            "fallback": fallback,
+        },
         "artifacts/final_model.joblib",
     )
 
-    print("Final model saved with threshold =", FINAL_THRESHOLD)
+    print(
+        f"Final model ({args.encoding} encoding) saved with threshold =",
+        FINAL_THRESHOLD,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,331 @@
+# src/data/stream_split.py
+"""
+Streaming patient-level splitter for data that does not fit in memory.
+
+Each patient_nbr is hashed (salted BLAKE2b) into one of N_BUCKETS
+buckets and each bucket range maps to train / val / test, so a patient's
+split depends only on their id: it is the same on every run and for
+rows appended later. Input is read in chunks (CSV or Parquet) and
+written as a hive-partitioned Parquet dataset, one directory per split:
+
+    python -m src.data.stream_split data/raw/diabetic_data.csv \
+        --out data/processed/splits
+    python -m src.data.stream_split new_rows.csv --out data/processed/splits --append
+
+    pd.read_parquet("data/processed/splits/split=train")
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import secrets
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.data.load_and_split import create_target
+from src.features.preprocessing import NUMERIC_FEATURES
+
+N_BUCKETS = 10_000
+DEFAULT_SALT = "patient-split-v1"
+DEFAULT_FRACTIONS = {"train": 0.7, "val": 0.1, "test": 0.2}
+
+# Integer fields of the raw extract. Every other CSV column is read as
+# text, so a chunk's dtypes never depend on the values it happens to
+# hold (all "None" -> float, all-numeric ICD-9 codes "428" -> 428.0)
+INTEGER_COLUMNS = [
+    "encounter_id",
+    "patient_nbr",
+    "admission_type_id",
+    "discharge_disposition_id",
+    "admission_source_id",
+    *NUMERIC_FEATURES,
+]
+
+CONFIG_FILE = "_split.json"
+SUMMARY_FILE = "_summary.json"
+
+
+# -------------------------
+# Assignment
+# -------------------------
+def patient_buckets(patient_nbr: pd.Series, salt: str = DEFAULT_SALT) -> np.ndarray:
+    """
+    Stable bucket in [0, N_BUCKETS) per row, hashing each distinct id once
+    """
+    codes, uniques = pd.factorize(patient_nbr)
+    buckets = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(f"{salt}:{int(p)}".encode(), digest_size=8).digest(),
+                "big",
+            )
+            % N_BUCKETS
+            for p in uniques
+        ],
+        dtype=np.int64,
+    )
+    return buckets[codes]
+
+
+def assign_splits(buckets: np.ndarray, fractions: dict) -> np.ndarray:
+    """
+    Split name per row; bucket ranges follow the order of `fractions`
+    """
+    names = list(fractions)
+    bounds = np.cumsum([fractions[name] for name in names]) * N_BUCKETS
+    index = np.searchsorted(bounds, buckets, side="right")
+    return np.array(names, dtype=object)[np.minimum(index, len(names) - 1)]
+
+
+# -------------------------
+# Input
+# -------------------------
+def iter_chunks(path: str, chunk_size: int):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    dtypes = defaultdict(lambda: str, {column: "Int64" for column in INTEGER_COLUMNS})
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtypes)
+
+
+# -------------------------
+# Output
+# -------------------------
+def load_config(out_dir: str):
+    path = os.path.join(out_dir, CONFIG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_config(out_dir: str, config: dict):
+    with open(os.path.join(out_dir, CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+
+
+def dataset_schema(out_dir: str):
+    """
+    Schema of the parts already in out_dir, or None if there are none
+    """
+    import pyarrow.parquet as pq
+
+    if not os.path.isdir(out_dir):
+        return None
+    for entry in sorted(os.listdir(out_dir)):
+        directory = os.path.join(out_dir, entry)
+        if not entry.startswith("split=") or not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".parquet"):
+                return pq.read_schema(os.path.join(directory, name)).remove_metadata()
+    return None
+
+
+def chunk_schema(table):
+    """
+    The table's schema with all-null columns typed as text
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+            for field in table.schema.remove_metadata()
+        ]
+    )
+
+
+class PartitionWriter:
+    """
+    One Parquet file per split for this run, appended chunk by chunk.
+    Every chunk is cast to `schema`: the existing dataset's when
+    appending, else the first chunk's.
+    """
+
+    def __init__(self, out_dir: str, schema=None):
+        self.out_dir = out_dir
+        self.run_id = (
+            datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            + "-"
+            + secrets.token_hex(4)
+        )
+        self.schema = schema
+        self._writers = {}
+
+    def write(self, split: str, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.schema is None:
+            self.schema = chunk_schema(table)
+        table = table.select(self.schema.names).cast(self.schema)
+
+        if split not in self._writers:
+            directory = os.path.join(self.out_dir, f"split={split}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run_id}.parquet")
+            self._writers[split] = pq.ParquetWriter(path, self.schema)
+        self._writers[split].write_table(table)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+
+def stream_split(
+    paths: list,
+    out_dir: str,
+    fractions: dict = DEFAULT_FRACTIONS,
+    salt: str = DEFAULT_SALT,
+    chunk_size: int = 50_000,
+    append: bool = False,
+) -> dict:
+    """
+    Split `paths` into out_dir/split=<name>/; returns rows written per split
+    """
+    if abs(sum(fractions.values()) - 1) > 1e-9:
+        raise ValueError(f"Split fractions must sum to 1, got {fractions}")
+
+    config = {"salt": salt, "fractions": fractions, "n_buckets": N_BUCKETS}
+    existing = load_config(out_dir)
+
+    if append:
+        # Appends must reuse the assignment the dataset was built with
+        if existing is not None and existing != config:
+            raise ValueError(
+                f"{out_dir} was split with {existing}; appending with {config} "
+                "would move patients between splits"
+            )
+    elif os.path.exists(out_dir) and os.listdir(out_dir):
+        raise ValueError(f"{out_dir} is not empty; use --append to add rows")
+
+    os.makedirs(out_dir, exist_ok=True)
+    save_config(out_dir, config)
+
+    writer = PartitionWriter(out_dir, dataset_schema(out_dir) if append else None)
+    rows = dict.fromkeys(fractions, 0)
+    try:
+        for path in paths:
+            for chunk in iter_chunks(path, chunk_size):
+                if "readmitted_binary" not in chunk.columns:
+                    chunk = create_target(chunk)
+
+                splits = assign_splits(
+                    patient_buckets(chunk["patient_nbr"], salt), fractions
+                )
+                for split, part in chunk.groupby(splits, sort=False):
+                    writer.write(split, part)
+                    rows[split] += len(part)
+                print(f"{path}: {sum(rows.values())} rows")
+    finally:
+        writer.close()
+
+    return rows
+
+
+# -------------------------
+# Summary
+# -------------------------
+def summarize(out_dir: str, chunk_size: int = 200_000) -> dict:
+    """
+    Rows, patients and target rate per split over the whole dataset
+    (every append so far), plus patients found in more than one split.
+    Memory grows with the number of distinct patients, not rows.
+    """
+    import pyarrow.parquet as pq
+
+    patients = {}
+    summary = {}
+    for entry in sorted(os.listdir(out_dir)):
+        if not entry.startswith("split="):
+            continue
+        split = entry.split("=", 1)[1]
+        directory = os.path.join(out_dir, entry)
+
+        ids = set()
+        n_rows = positives = 0
+        for name in sorted(os.listdir(directory)):
+            parquet = pq.ParquetFile(os.path.join(directory, name))
+            for batch in parquet.iter_batches(
+                batch_size=chunk_size, columns=["patient_nbr", "readmitted_binary"]
+            ):
+                df = batch.to_pandas()
+                ids.update(df["patient_nbr"].unique().tolist())
+                n_rows += len(df)
+                positives += int(df["readmitted_binary"].sum())
+
+        patients[split] = ids
+        summary[split] = {
+            "rows": n_rows,
+            "patients": len(ids),
+            "target_rate": positives / n_rows if n_rows else float("nan"),
+        }
+
+    names = list(patients)
+    overlap = {
+        f"{a}/{b}": len(patients[a] & patients[b])
+        for i, a in enumerate(names)
+        for b in names[i + 1 :]
+    }
+    total = sum(split["rows"] for split in summary.values())
+    for split in summary.values():
+        split["row_share"] = split["rows"] / total if total else float("nan")
+
+    result = {"splits": summary, "patient_overlap": overlap}
+    with open(os.path.join(out_dir, SUMMARY_FILE), "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def print_summary(result: dict):
+    print("\nSplit  | Rows     | Share  | Patients | Target rate")
+    print("---------------------------------------------------")
+    for name, split in result["splits"].items():
+        print(
+            f"{name:6s} | {split['rows']:8d} | {split['row_share']:6.1%} "
+            f"| {split['patients']:8d} | {split['target_rate']:.4f}"
+        )
+    for pair, count in result["patient_overlap"].items():
+        print(f"Patient overlap {pair}: {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a patient-level split")
+    parser.add_argument("paths", nargs="+", help="CSV or Parquet input files")
+    parser.add_argument("--out", default="data/processed/splits")
+    parser.add_argument("--val", type=float, default=DEFAULT_FRACTIONS["val"])
+    parser.add_argument("--test", type=float, default=DEFAULT_FRACTIONS["test"])
+    parser.add_argument("--salt", default=DEFAULT_SALT)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--append", action="store_true")
+    args = parser.parse_args(argv)
+
+    fractions = {
+        "train": round(1 - args.val - args.test, 10),
+        "val": args.val,
+        "test": args.test,
+    }
+    stream_split(
+        args.paths, args.out, fractions, args.salt, args.chunk_size, args.append
+    )
+
+    result = summarize(args.out)
+    print_summary(result)
+
+    overlap = sum(result["patient_overlap"].values())
+    return 1 if overlap else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
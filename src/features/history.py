@@ -0,0 +1,373 @@
+# src/features/history.py
+"""
+Per-patient prior-utilization features.
+
+Training computes them for every encounter with sorted groupby /
+cumulative operations; serving keeps one compact state row per patient
+that is read and updated in O(1) per encounter, so a patient's history
+is never re-aggregated.
+"""
+
+import contextlib
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+HISTORY_STORE_PATH = "artifacts/patient_history.sqlite"
+
+HISTORY_FEATURES = [
+    "prior_encounters",
+    "days_since_last_discharge",
+    "cum_inpatient",
+    "cum_emergency",
+]
+
+# State of a patient with no earlier encounters on record
+EMPTY_HISTORY = {
+    "prior_encounters": 0,
+    "days_since_last_discharge": np.nan,
+    "cum_inpatient": 0,
+    "cum_emergency": 0,
+}
+
+# Encounters are ordered by discharge date when known, else encounter_id
+ORDER_COLUMN = "encounter_id"
+DATE_COLUMN = "discharge_date"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patient_history (
+    patient_nbr INTEGER PRIMARY KEY,
+    n_encounters INTEGER NOT NULL,
+    cum_inpatient INTEGER NOT NULL,
+    cum_emergency INTEGER NOT NULL,
+    last_discharge INTEGER
+);
+CREATE TABLE IF NOT EXISTS recorded_encounters (
+    encounter_id INTEGER PRIMARY KEY,
+    patient_nbr INTEGER NOT NULL,
+    prior_encounters INTEGER NOT NULL,
+    days_since_last_discharge REAL,
+    cum_inpatient INTEGER NOT NULL,
+    cum_emergency INTEGER NOT NULL
+);
+"""
+
+
+# -------------------------
+# Training: vectorized
+# -------------------------
+def add_history_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add HISTORY_FEATURES computed from each patient's earlier encounters
+    in df. days_since_last_discharge needs a discharge_date column and is
+    NaN otherwise (and for a patient's first encounter).
+    """
+    df = df.copy()
+    has_dates = DATE_COLUMN in df.columns
+
+    sort_by = ["patient_nbr", DATE_COLUMN if has_dates else ORDER_COLUMN]
+    ordered = df.sort_values(sort_by, kind="stable")
+    groups = ordered.groupby("patient_nbr", sort=False)
+
+    ordered["prior_encounters"] = groups.cumcount()
+    for feature, column in (
+        ("cum_inpatient", "number_inpatient"),
+        ("cum_emergency", "number_emergency"),
+    ):
+        ordered[feature] = groups[column].cumsum() - ordered[column]
+
+    if has_dates:
+        discharge = pd.to_datetime(ordered[DATE_COLUMN])
+        admission = discharge - pd.to_timedelta(ordered["time_in_hospital"], "D")
+        previous = discharge.groupby(ordered["patient_nbr"], sort=False).shift()
+        ordered["days_since_last_discharge"] = (admission - previous).dt.days
+    else:
+        ordered["days_since_last_discharge"] = np.nan
+
+    return ordered.loc[df.index]
+
+
+# -------------------------
+# Serving: O(1) state store
+# -------------------------
+class PatientHistoryStore:
+    """
+    One row of running totals per patient in SQLite, shared by all
+    API workers
+    """
+
+    def __init__(self, path: str = HISTORY_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+        # Recording runs on its own connection so reads aren't held up
+        # while a batch's transaction is open; BEGIN IMMEDIATE takes the
+        # database write lock, which also serializes the other workers
+        self._writer = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._write_lock = threading.Lock()
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _state(conn, patient_nbr):
+        return conn.execute(
+            "SELECT n_encounters, cum_inpatient, cum_emergency, "
+            "last_discharge FROM patient_history WHERE patient_nbr = ?",
+            (int(patient_nbr),),
+        ).fetchone()
+
+    @staticmethod
+    def _recorded(conn, encounter_ids: list) -> dict:
+        """
+        {encounter_id: features it was recorded with} for known ids
+        """
+        if not encounter_ids:
+            return {}
+        placeholders = ",".join("?" * len(encounter_ids))
+        query = (
+            f"SELECT encounter_id, {', '.join(HISTORY_FEATURES)} "
+            f"FROM recorded_encounters WHERE encounter_id IN ({placeholders})"  # nosec B608
+        )
+        return {
+            row[0]: {
+                feature: np.nan if value is None else value
+                for feature, value in zip(HISTORY_FEATURES, row[1:])
+            }
+            for row in conn.execute(query, encounter_ids)
+        }
+
+    def features(self, patient_nbr, record: dict) -> dict:
+        """
+        HISTORY_FEATURES for a new encounter, from the stored state
+        """
+        if patient_nbr is None:
+            return dict(EMPTY_HISTORY)
+        with self._lock:
+            state = self._state(self._conn, patient_nbr)
+        return state_features(state, record)
+
+    @contextlib.contextmanager
+    def recording(self, records: list):
+        """
+        Record a batch and yield each record's HISTORY_FEATURES, all in
+        one write transaction: committed when the block exits cleanly,
+        rolled back if it raises. Each record sees the new ones before
+        it; an encounter_id recorded before is not counted again and
+        gets the features it was first recorded with.
+        """
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._apply(records)
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+
+    def record_encounters(self, records: list) -> list:
+        """
+        Record a batch; returns the features each record was recorded with
+        """
+        with self.recording(records) as features:
+            return features
+
+    def record_encounter(self, patient_nbr, record: dict) -> dict:
+        """
+        Fold one completed encounter into the patient's running totals
+        """
+        return self.record_encounters([{**record, "patient_nbr": patient_nbr}])[0]
+
+    def encounter_features(self, records: list) -> list:
+        """
+        What record_encounters() would return, without recording anything
+        """
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                return self._apply(records)
+            finally:
+                self._writer.execute("ROLLBACK")
+
+    def _apply(self, records: list) -> list:
+        conn = self._writer
+        ids = [
+            int(record["encounter_id"])
+            for record in records
+            if record.get("encounter_id") is not None
+        ]
+        known = self._recorded(conn, ids)
+
+        result = []
+        for record in records:
+            encounter_id = record.get("encounter_id")
+            if encounter_id is not None and int(encounter_id) in known:
+                result.append(dict(known[int(encounter_id)]))
+                continue
+
+            patient_nbr = record.get("patient_nbr")
+            if patient_nbr is None:
+                result.append(dict(EMPTY_HISTORY))
+                continue
+
+            features = state_features(self._state(conn, patient_nbr), record)
+            self._record(conn, record, features)
+            if encounter_id is not None:
+                known[int(encounter_id)] = features
+            result.append(features)
+        return result
+
+    @staticmethod
+    def _record(conn, record: dict, features: dict):
+        patient_nbr = int(record["patient_nbr"])
+        encounter_id = record.get("encounter_id")
+        if encounter_id is not None:
+            days = features["days_since_last_discharge"]
+            conn.execute(
+                "INSERT INTO recorded_encounters VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    int(encounter_id),
+                    patient_nbr,
+                    int(features["prior_encounters"]),
+                    None if pd.isna(days) else float(days),
+                    int(features["cum_inpatient"]),
+                    int(features["cum_emergency"]),
+                ),
+            )
+
+        conn.execute(
+            """
+            INSERT INTO patient_history VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT (patient_nbr) DO UPDATE SET
+                n_encounters = n_encounters + 1,
+                cum_inpatient = cum_inpatient + excluded.cum_inpatient,
+                cum_emergency = cum_emergency + excluded.cum_emergency,
+                last_discharge = coalesce(
+                    max(last_discharge, excluded.last_discharge),
+                    last_discharge,
+                    excluded.last_discharge
+                )
+            """,
+            (
+                patient_nbr,
+                int(record["number_inpatient"]),
+                int(record["number_emergency"]),
+                discharge_day(record),
+            ),
+        )
+
+    def bootstrap(self, df: pd.DataFrame) -> int:
+        """
+        Replace the store with the final state of every patient in df
+        """
+        has_dates = DATE_COLUMN in df.columns
+        state = df.groupby("patient_nbr").agg(
+            n_encounters=("patient_nbr", "size"),
+            cum_inpatient=("number_inpatient", "sum"),
+            cum_emergency=("number_emergency", "sum"),
+        )
+        if has_dates:
+            last = pd.to_datetime(df[DATE_COLUMN]).groupby(df["patient_nbr"]).max()
+            state["last_discharge"] = last.map(lambda d: d.toordinal())
+        else:
+            state["last_discharge"] = None
+
+        rows = [
+            (
+                int(patient),
+                int(n),
+                int(inpatient),
+                int(emergency),
+                None if pd.isna(last_day) else int(last_day),
+            )
+            for patient, n, inpatient, emergency, last_day in state.itertuples()
+        ]
+        encounters = []
+        if ORDER_COLUMN in df.columns:
+            recorded = add_history_features(df)
+            days = recorded["days_since_last_discharge"].astype(float)
+            encounters = list(
+                zip(
+                    recorded[ORDER_COLUMN].astype(int).tolist(),
+                    recorded["patient_nbr"].astype(int).tolist(),
+                    recorded["prior_encounters"].astype(int).tolist(),
+                    days.where(days.notna(), None).tolist(),
+                    recorded["cum_inpatient"].astype(int).tolist(),
+                    recorded["cum_emergency"].astype(int).tolist(),
+                )
+            )
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM patient_history")
+            self._conn.execute("DELETE FROM recorded_encounters")
+            self._conn.executemany(
+                "INSERT INTO patient_history VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "INSERT INTO recorded_encounters VALUES (?, ?, ?, ?, ?, ?)",
+                encounters,
+            )
+        return len(rows)
+
+
+def state_features(state, record: dict) -> dict:
+    """
+    HISTORY_FEATURES for record given the patient's stored state
+    (None for a patient with no earlier encounters)
+    """
+    if state is None:
+        return dict(EMPTY_HISTORY)
+
+    n_encounters, cum_inpatient, cum_emergency, last_discharge = state
+    days = np.nan
+    discharge = discharge_day(record)
+    if last_discharge is not None and discharge is not None:
+        days = discharge - int(record["time_in_hospital"]) - last_discharge
+
+    return {
+        "prior_encounters": n_encounters,
+        "days_since_last_discharge": days,
+        "cum_inpatient": cum_inpatient,
+        "cum_emergency": cum_emergency,
+    }
+
+
+def discharge_day(record: dict):
+    """
+    Discharge date as a day ordinal, or None when the record has none
+    """
+    value = record.get(DATE_COLUMN)
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).toordinal()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the patient history store")
+    parser.add_argument("paths", nargs="+", help="Parquet files with all encounters")
+    parser.add_argument("--store", default=HISTORY_STORE_PATH)
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_parquet(path) for path in args.paths], ignore_index=True)
+    store = PatientHistoryStore(args.store)
+    count = store.bootstrap(df)
+    store.close()
+
+    print(f"Patient history store {args.store}: {count} patients")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # src/features/preprocessing.py
 
+import numpy as np
 import pandas as pd
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
@@ -11,6 +12,40 @@ from sklearn.preprocessing import (
     StandardScaler,
 )
 
+from src.features.history import HISTORY_FEATURES
+
+# "onehot": sparse one-hot columns for any estimator
+# "native": one integer code per categorical column, for XGBoost's
+#           native categorical splits (see native_feature_types)
+ENCODINGS = ("onehot", "native")
+
+NUMERIC_FEATURES = [
+    "time_in_hospital",
+    "num_lab_procedures",
+    "num_procedures",
+    "num_medications",
+    "number_outpatient",
+    "number_emergency",
+    "number_inpatient",
+    "number_diagnoses",
+]
+
+ORDINAL_FEATURES = ["age"]
+
+CATEGORICAL_FEATURES = [
+    "race",
+    "gender",
+    "admission_type_id",
+    "discharge_disposition_id",
+    "admission_source_id",
+    "insulin",
+    "diabetesMed",
+    "change",
+    "diag_1_group",
+    "diag_2_group",
+    "diag_3_group",
+]
+
 
 # -------------------------
 # Diagnosis code grouping
@@ -43,41 +78,23 @@ def map_diag(code):
 def add_diag_groups(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     for col in ["diag_1", "diag_2", "diag_3"]:
-        df[col + "_group"] = df[col].apply(map_diag)
+        # Map each distinct code once; batches repeat codes heavily
+        groups = {code: map_diag(code) for code in df[col].unique()}
+        df[col + "_group"] = df[col].map(groups)
     return df
 
 
 # -------------------------
 # Preprocessing pipeline
 # -------------------------
-def build_preprocessing_pipeline():
-
-    numeric_features = [
-        "time_in_hospital",
-        "num_lab_procedures",
-        "num_procedures",
-        "num_medications",
-        "number_outpatient",
-        "number_emergency",
-        "number_inpatient",
-        "number_diagnoses",
-    ]
-
-    ordinal_features = ["age"]
-
-    categorical_features = [
-        "race",
-        "gender",
-        "admission_type_id",
-        "discharge_disposition_id",
-        "admission_source_id",
-        "insulin",
-        "diabetesMed",
-        "change",
-        "diag_1_group",
-        "diag_2_group",
-        "diag_3_group",
-    ]
+def build_preprocessing_pipeline(history: bool = False, encoding: str = "onehot"):
+    """
+    history=True also consumes the patient-history columns added by
+    src.features.history.add_history_features; encoding is one of
+    ENCODINGS
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
 
     numeric_pipeline = Pipeline(
         steps=[
@@ -93,21 +110,44 @@ def build_preprocessing_pipeline():
         ]
     )
 
+    if encoding == "native":
+        # Unseen categories become NaN, which the booster treats as missing
+        encoder = OrdinalEncoder(
+            handle_unknown="use_encoded_value", unknown_value=np.nan
+        )
+    else:
+        encoder = OneHotEncoder(handle_unknown="ignore")
+
     categorical_pipeline = Pipeline(
         steps=[
             ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
-            ("encoder", OneHotEncoder(handle_unknown="ignore")),
+            ("encoder", encoder),
         ]
     )
 
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("num", numeric_pipeline, numeric_features),
-            ("ord", ordinal_pipeline, ordinal_features),
-            ("cat", categorical_pipeline, categorical_features),
-        ],
-        remainder="drop",
-    )
+    transformers = [
+        ("num", numeric_pipeline, NUMERIC_FEATURES),
+        ("ord", ordinal_pipeline, ORDINAL_FEATURES),
+        ("cat", categorical_pipeline, CATEGORICAL_FEATURES),
+    ]
+
+    if history:
+        # -1 marks "no earlier encounter / discharge date unknown"; kept
+        # even when no training row has dates so the layout never shifts
+        history_pipeline = Pipeline(
+            steps=[
+                (
+                    "imputer",
+                    SimpleImputer(
+                        strategy="constant", fill_value=-1, keep_empty_features=True
+                    ),
+                ),
+                ("scaler", StandardScaler()),
+            ]
+        )
+        transformers.append(("hist", history_pipeline, HISTORY_FEATURES))
+
+    preprocessor = ColumnTransformer(transformers=transformers, remainder="drop")
 
     full_pipeline = Pipeline(
         steps=[
@@ -117,3 +157,15 @@ def build_preprocessing_pipeline():
     )
 
     return full_pipeline
+
+
+def native_feature_types(history: bool = False) -> list:
+    """
+    XGBoost feature_types for the "native" encoding's output columns:
+    "c" for category codes, "q" for everything else
+    """
+    types = ["q"] * (len(NUMERIC_FEATURES) + len(ORDINAL_FEATURES))
+    types += ["c"] * len(CATEGORICAL_FEATURES)
+    if history:
+        types += ["q"] * len(HISTORY_FEATURES)
+    return types
@@ -0,0 +1,312 @@
+# src/features/store.py
+"""
+Local feature store: preprocessed feature rows keyed by encounter_id
+(and indexed by patient_nbr) in an embedded SQLite file, so known
+encounters can be re-scored without re-running the preprocessing.
+
+    python -m src.features.store build data/processed/train.parquet \
+        data/processed/test.parquet
+    python -m src.features.store upsert new_encounters.parquet
+"""
+
+import argparse
+import contextlib
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+from scipy import sparse
+
+STORE_PATH = "artifacts/feature_store.sqlite"
+ARTIFACT_PATH = "artifacts/final_model.joblib"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    encounter_id INTEGER PRIMARY KEY,
+    patient_nbr INTEGER,
+    idx BLOB,
+    val BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_patient ON features (patient_nbr);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def artifact_fingerprint(path: str = ARTIFACT_PATH) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_id(artifact: dict, path: str = ARTIFACT_PATH) -> str:
+    """
+    Id of the fitted pipeline the store rows were transformed with.
+    Written at training, so re-saving the artifact with a new threshold
+    keeps it; older artifacts fall back to the whole file's fingerprint.
+    """
+    return artifact.get("model_id") or artifact_fingerprint(path)
+
+
+def featurize(pipeline, df):
+    """
+    Run only the fitted preprocessing step of the model pipeline
+    """
+    return pipeline.named_steps["preprocessing"].transform(df)
+
+
+class FeatureStore:
+    """
+    Rows are stored in the layout the preprocessor produced: CSR rows
+    keep only their non-zero indices / values, because the booster
+    treats entries absent from a sparse matrix as missing, not zero.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # Metadata
+    # -------------------------
+    def meta(self) -> dict:
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, value FROM meta"))
+
+    def _check_layout(self, X, fingerprint):
+        layout = "csr" if sparse.issparse(X) else "dense"
+        expected = {
+            "layout": layout,
+            "n_features": str(X.shape[1]),
+            "model": fingerprint,
+        }
+        current = self.meta()
+        if current and current != expected:
+            raise ValueError(
+                f"Feature store {self.path} was built for {current}, got {expected}"
+            )
+        if not current:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)", expected.items()
+                )
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def upsert(self, encounter_ids, patient_nbrs, X, fingerprint: str):
+        """
+        Insert or replace transformed rows for the given encounters
+        """
+        self._check_layout(X, fingerprint)
+
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X, dtype=np.float32)
+            X.eliminate_zeros()
+            rows = (
+                (
+                    X.indices[start:end].astype(np.int32).tobytes(),
+                    X.data[start:end].tobytes(),
+                )
+                for start, end in zip(X.indptr[:-1], X.indptr[1:])
+            )
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            rows = ((None, row.tobytes()) for row in X)
+
+        records = [
+            (int(encounter_id), int(patient_nbr), idx, val)
+            for encounter_id, patient_nbr, (idx, val) in zip(
+                encounter_ids, patient_nbrs, rows
+            )
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?)", records
+            )
+        return len(records)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def encounters_for_patient(self, patient_nbr: int) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT encounter_id FROM features WHERE patient_nbr = ? "
+                "ORDER BY encounter_id",
+                (int(patient_nbr),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get(self, encounter_ids: list):
+        """
+        Returns (found encounter_ids, feature matrix in stored layout)
+        """
+        meta = self.meta()
+        n_features = int(meta.get("n_features", 0))
+        ids = [int(encounter_id) for encounter_id in encounter_ids]
+
+        placeholders = ",".join("?" * len(ids))
+        query = (
+            "SELECT encounter_id, idx, val FROM features "
+            f"WHERE encounter_id IN ({placeholders})"  # nosec B608
+        )
+        with self._lock:
+            found = {row[0]: row[1:] for row in self._conn.execute(query, ids)}
+        ids = [encounter_id for encounter_id in ids if encounter_id in found]
+
+        if meta.get("layout") == "dense":
+            X = np.array(
+                [np.frombuffer(found[i][1], dtype=np.float32) for i in ids],
+                dtype=np.float32,
+            ).reshape(len(ids), n_features)
+            return ids, X
+
+        indptr = [0]
+        indices, data = [], []
+        for encounter_id in ids:
+            idx, val = found[encounter_id]
+            indices.append(np.frombuffer(idx, dtype=np.int32))
+            data.append(np.frombuffer(val, dtype=np.float32))
+            indptr.append(indptr[-1] + len(indices[-1]))
+
+        X = sparse.csr_matrix(
+            (
+                np.concatenate(data) if data else np.empty(0, np.float32),
+                np.concatenate(indices) if indices else np.empty(0, np.int32),
+                indptr,
+            ),
+            shape=(len(ids), n_features),
+        )
+        return ids, X
+
+
+# -------------------------
+# Bulk build / upsert
+# -------------------------
+def iter_encounters(path, chunk_size, with_history=False, ordered=False):
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    from src.features.history import (
+        DATE_COLUMN,
+        ORDER_COLUMN,
+        add_history_features,
+    )
+
+    if not (with_history or ordered):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    # History needs each patient's encounters in order, not one chunk
+    df = pd.read_parquet(path)
+    if with_history:
+        df = add_history_features(df)
+    else:
+        order = DATE_COLUMN if DATE_COLUMN in df.columns else ORDER_COLUMN
+        df = df.sort_values(order, kind="stable")
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size]
+
+
+def load_into_store(
+    store,
+    pipeline,
+    paths,
+    fingerprint,
+    history=False,
+    history_store=None,
+    chunk_size=20_000,
+):
+    """
+    With history and no history_store (build), history features come
+    from each file's own rows. With a PatientHistoryStore (upsert), each
+    encounter continues its patient's recorded totals and is recorded
+    there in the same transaction, as /encounters does.
+    """
+    import pandas as pd
+
+    history_store = history_store if history else None
+    total = 0
+    for path in paths:
+        chunks = iter_encounters(
+            path,
+            chunk_size,
+            with_history=history and history_store is None,
+            ordered=history_store is not None,
+        )
+        for df in chunks:
+            recording = contextlib.nullcontext()
+            if history_store is not None:
+                recording = history_store.recording(df.to_dict("records"))
+
+            with recording as features:
+                if features is not None:
+                    df = df.assign(**pd.DataFrame(features, index=df.index))
+                X = featurize(pipeline, df)
+                total += store.upsert(
+                    df["encounter_id"], df["patient_nbr"], X, fingerprint
+                )
+            print(f"{path}: {total} rows")
+    return total
+
+
+def main():
+    import joblib
+
+    from src.features.history import HISTORY_STORE_PATH, PatientHistoryStore
+
+    parser = argparse.ArgumentParser(description="Build or update the feature store")
+    parser.add_argument("command", choices=["build", "upsert"])
+    parser.add_argument("paths", nargs="+", help="Parquet files with raw encounters")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--artifact", default=ARTIFACT_PATH)
+    parser.add_argument(
+        "--history-store",
+        default=HISTORY_STORE_PATH,
+        help="Patient history store that upsert reads and records into",
+    )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        # A fresh build replaces whatever the store held before
+        with sqlite3.connect(args.store) as conn:
+            conn.execute("DROP TABLE IF EXISTS features")
+            conn.execute("DROP TABLE IF EXISTS meta")
+        conn.close()
+
+    artifact = joblib.load(args.artifact)
+    history = bool(artifact.get("history_features"))
+    history_store = None
+    if history and args.command == "upsert":
+        history_store = PatientHistoryStore(args.history_store)
+
+    store = FeatureStore(args.store)
+    total = load_into_store(
+        store,
+        artifact["pipeline"],
+        args.paths,
+        model_id(artifact, args.artifact),
+        history=history,
+        history_store=history_store,
+    )
+    store.close()
+    if history_store is not None:
+        history_store.close()
+
+    print(f"Feature store {args.store}: {total} rows written")
+
+
+if __name__ == "__main__":
+    main()
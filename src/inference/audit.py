@@ -0,0 +1,262 @@
+# src/inference/audit.py
+"""
+Write-behind prediction audit log.
+
+Request handlers hand records to AuditSink.submit(), which only puts
+them on a bounded queue. A background thread drains the queue in
+batches and appends them to Parquet files that rotate by size and age.
+Files are written as *.parquet.inprogress and renamed once closed, so
+readers only ever see complete files.
+"""
+
+import json
+import math
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+# What submit() does when the queue is full
+POLICIES = ("drop_newest", "drop_oldest", "block")
+
+_STOP = object()
+
+
+def audit_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("endpoint", pa.string()),
+            ("model_version", pa.string()),
+            ("tier", pa.string()),
+            ("degraded", pa.bool_()),
+            ("threshold", pa.float64()),
+            ("probability", pa.float64()),
+            ("prediction", pa.int8()),
+            ("latency_ms", pa.float64()),
+            # Raw request fields as JSON, so schema changes don't split files
+            ("inputs", pa.string()),
+        ]
+    )
+
+
+def inputs_json(inputs) -> str:
+    """
+    The inputs column: numpy scalars as plain values, NaN as null
+    """
+
+    def clean(value):
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [clean(item) for item in value]
+        if hasattr(value, "item"):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    return json.dumps(clean(inputs), default=str)
+
+
+class AuditSink:
+    """
+    max_queue        -- records buffered before `policy` applies
+    batch_size       -- records per Parquet row group, at most
+    flush_interval_s -- longest a record waits in the queue
+    max_file_bytes / max_file_age_s -- rotate to a new file past either
+    block_timeout_s  -- longest submit() waits under the "block" policy
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        policy: str = "drop_newest",
+        max_queue: int = 10_000,
+        batch_size: int = 1_000,
+        flush_interval_s: float = 1.0,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        max_file_age_s: float = 3600.0,
+        block_timeout_s: float = 0.05,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+
+        import pyarrow  # noqa: F401  (fail at startup, not in the writer thread)
+
+        self.directory = directory
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age_s = max_file_age_s
+        self.block_timeout_s = block_timeout_s
+
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.files = []
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._path = None
+        self._opened_at = 0.0
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="audit-sink", daemon=True
+        )
+        self._thread.start()
+
+    # -------------------------
+    # Producer side (request threads)
+    # -------------------------
+    def submit(self, record: dict) -> bool:
+        """
+        Queue one record; returns False if it was dropped
+        """
+        with self._lock:
+            self.submitted += 1
+        if self._closed:
+            self._count_dropped(1)
+            return False
+
+        try:
+            if self.policy == "block":
+                self._queue.put(record, timeout=self.block_timeout_s)
+            else:
+                self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == "drop_oldest":
+            try:
+                oldest = self._queue.get_nowait()
+                if oldest is _STOP:
+                    # Raced with close(): keep the stop marker, drop the record
+                    self._queue.put_nowait(oldest)
+                else:
+                    self._count_dropped(1)
+                    self._queue.put_nowait(record)
+                    return True
+            except (queue.Empty, queue.Full):
+                pass
+
+        self._count_dropped(1)
+        return False
+
+    def _count_dropped(self, n: int):
+        with self._lock:
+            self.dropped += n
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self, timeout: float = 10.0):
+        """
+        Stop accepting records, flush everything queued and close the
+        current file
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # The writer is stuck; don't hang shutdown waiting for it
+            print("❌ Audit log writer not draining, records left unwritten")
+            return
+        self._thread.join(max(deadline - time.monotonic(), 0))
+
+    # -------------------------
+    # Writer thread
+    # -------------------------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self._count_dropped(len(batch))
+                    print("❌ Audit log write failed:", str(e))
+            elif self._writer is not None and self._expired():
+                self._close_quietly()
+        self._close_quietly()
+
+    def _next_batch(self):
+        """
+        Up to batch_size records collected for at most flush_interval_s;
+        returns (batch, stop requested)
+        """
+        batch = []
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.max_file_age_s
+
+    def _write(self, batch: list):
+        import pyarrow as pa
+
+        if self._writer is not None and (
+            self._expired()
+            or os.path.getsize(self._path + ".inprogress") >= self.max_file_bytes
+        ):
+            self._close_file()
+        if self._writer is None:
+            self._open_file()
+
+        rows = [dict(record, inputs=inputs_json(record["inputs"])) for record in batch]
+        table = pa.Table.from_pylist(rows, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self.written += len(batch)
+
+    def _open_file(self):
+        import pyarrow.parquet as pq
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        name = f"audit-{stamp}-{os.getpid()}.parquet"
+        self._path = os.path.join(self.directory, name)
+        self._writer = pq.ParquetWriter(self._path + ".inprogress", audit_schema())
+        self._opened_at = time.monotonic()
+
+    def _close_quietly(self):
+        """
+        Close the current file outside a write; a failure is logged, not
+        allowed to end the writer thread
+        """
+        try:
+            self._close_file()
+        except Exception as e:
+            self._writer = None
+            print("❌ Audit log close failed:", str(e))
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._path + ".inprogress", self._path)
+        self.files.append(self._path)
+        self._writer = None
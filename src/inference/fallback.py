@@ -0,0 +1,166 @@
+# src/inference/fallback.py
+"""
+Logistic-regression fallback for load shedding.
+
+compile_scorer() flattens a fitted preprocessing + LogisticRegression
+pipeline into plain lookup tables: one weight index per one-hot /
+ordinal category and a folded (x - offset) * weight term per numeric
+column. Scoring a record is then a sparse dot product over its active
+indices plus the numerics, with no pandas or sklearn on the path.
+"""
+
+import math
+
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from src.features.preprocessing import map_diag
+
+# Columns the preprocessing derives from raw fields before the encoders
+DERIVED = {
+    "diag_1_group": ("diag_1", map_diag),
+    "diag_2_group": ("diag_2", map_diag),
+    "diag_3_group": ("diag_3", map_diag),
+}
+
+
+def _key(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class LinearScorer:
+    """
+    numeric -- (column, fill, offset, weight): adds (x - offset) * weight
+    index   -- {(column, category): position in weights}
+    fills   -- {column: value used when a categorical field is missing}
+
+    threshold is the decision threshold for this model's probabilities,
+    which are not calibrated like the primary model's.
+    """
+
+    def __init__(self, numeric, index, weights, fills, intercept, threshold=0.5):
+        self.numeric = numeric
+        self.index = index
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.fills = fills
+        self.intercept = float(intercept)
+        self.threshold = threshold
+
+    def _value(self, record: dict, column: str):
+        if column in DERIVED:
+            source, derive = DERIVED[column]
+            return derive(record.get(source))
+        return record.get(column)
+
+    def active(self, record: dict) -> list:
+        """
+        Weight positions switched on by the record's categorical fields
+        """
+        positions = []
+        for column, fill in self.fills.items():
+            value = self._value(record, column)
+            value = fill if _is_missing(value) else _key(value)
+            position = self.index.get((column, value))
+            # Categories unseen in training contribute nothing
+            if position is not None:
+                positions.append(position)
+        return positions
+
+    def logit(self, record: dict) -> float:
+        total = self.intercept
+        for column, fill, offset, weight in self.numeric:
+            value = record.get(column)
+            value = fill if _is_missing(value) else float(value)
+            total += (value - offset) * weight
+        for position in self.active(record):
+            total += self.weights[position]
+        return total
+
+    def predict_proba(self, records: list) -> np.ndarray:
+        """
+        (n, 2) class probabilities, like sklearn's predict_proba
+        """
+        logits = np.array([self.logit(record) for record in records])
+        positive = 1.0 / (1.0 + np.exp(-logits))
+        return np.column_stack([1.0 - positive, positive])
+
+
+# -------------------------
+# Compilation
+# -------------------------
+def _compile_numeric(steps, columns, coef):
+    imputer, scaler = steps
+    if not isinstance(scaler, StandardScaler):
+        raise ValueError(f"Unsupported numeric step: {scaler!r}")
+
+    # StandardScaler with_mean/with_std=False leaves mean_ / scale_ as None
+    means = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(columns))
+    scales = scaler.scale_ if scaler.scale_ is not None else np.ones(len(columns))
+    return [
+        (column, float(fill), float(mean), float(weight / scale))
+        for column, fill, mean, scale, weight in zip(
+            columns, imputer.statistics_, means, scales, coef
+        )
+    ]
+
+
+def _compile_categorical(steps, columns, coef, index, weights, fills):
+    imputer, encoder = steps
+
+    if isinstance(encoder, OneHotEncoder):
+        if encoder.drop_idx_ is not None:
+            raise ValueError("OneHotEncoder(drop=...) is not supported")
+        offset = 0
+        for column, categories in zip(columns, encoder.categories_):
+            for category in categories:
+                index[(column, _key(category))] = len(weights)
+                weights.append(float(coef[offset]))
+                offset += 1
+    elif isinstance(encoder, OrdinalEncoder):
+        # One code per category: fold code * weight into a per-category term
+        for column, categories, weight in zip(columns, encoder.categories_, coef):
+            for code, category in enumerate(categories):
+                index[(column, _key(category))] = len(weights)
+                weights.append(float(code * weight))
+    else:
+        raise ValueError(f"Unsupported categorical step: {encoder!r}")
+
+    for column, fill in zip(columns, imputer.statistics_):
+        fills[column] = _key(fill)
+
+
+def compile_scorer(pipeline, threshold: float = 0.5) -> LinearScorer:
+    """
+    Build a LinearScorer from a fitted Pipeline of
+    ("preprocessing", build_preprocessing_pipeline()) and a binary
+    linear model
+    """
+    model = pipeline.named_steps["model"]
+    transformer = pipeline.named_steps["preprocessing"].named_steps["preprocessor"]
+    coef = model.coef_.ravel()
+
+    numeric, index, weights, fills = [], {}, [], {}
+    for name, steps, columns in transformer.transformers_:
+        if name == "remainder":
+            continue
+
+        steps = [step for _, step in steps.steps]
+        if len(steps) != 2 or not isinstance(steps[0], SimpleImputer):
+            raise ValueError(f"Unsupported transformer '{name}'")
+
+        part = coef[transformer.output_indices_[name]]
+        if isinstance(steps[1], StandardScaler):
+            numeric += _compile_numeric(steps, columns, part)
+        else:
+            _compile_categorical(steps, columns, part, index, weights, fills)
+
+    return LinearScorer(numeric, index, weights, fills, model.intercept_[0], threshold)
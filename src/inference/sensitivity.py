@@ -0,0 +1,63 @@
+# src/inference/sensitivity.py
+"""
+What-if sweeps: vary one or more fields of a single patient over a grid
+of values and score every variant in one batched predict_proba call.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.inference.tiers import predict_proba_tier
+
+# Variants per sweep (50 x 50 = 2500 fits comfortably)
+MAX_GRID_SIZE = 10_000
+
+
+def numeric_range(start: float, stop: float, num: int, integer: bool = True) -> list:
+    """
+    num evenly spaced values from start to stop (inclusive); integer
+    fields are rounded and de-duplicated
+    """
+    values = np.linspace(start, stop, num)
+    if integer:
+        return sorted({int(round(v)) for v in values})
+    return [float(v) for v in values]
+
+
+def build_grid(record: dict, axes: dict) -> pd.DataFrame:
+    """
+    One row per combination of axis values (first axis varies slowest),
+    every other field copied from record, plus the unchanged record as
+    the last row
+    """
+    shape = [len(values) for values in axes.values()]
+    size = int(np.prod(shape))
+    if size == 0:
+        raise ValueError("Every sweep axis needs at least one value")
+    if size > MAX_GRID_SIZE:
+        raise ValueError(f"Sweep of {size} variants exceeds {MAX_GRID_SIZE}")
+
+    base = pd.DataFrame([record])
+    grid = base.iloc[np.zeros(size + 1, dtype=np.intp)].reset_index(drop=True)
+
+    # Index of each variant along every axis, without a Python-level loop
+    codes = np.unravel_index(np.arange(size), shape)
+    for (field, values), code in zip(axes.items(), codes):
+        column = pd.Series(values).iloc[code].tolist()
+        grid[field] = pd.Series(column + [record[field]]).infer_objects()
+
+    return grid
+
+
+def sweep(pipeline, record: dict, axes: dict, n_trees=None) -> dict:
+    """
+    {"baseline": p, "probabilities": nested lists shaped like the axes}
+    """
+    grid = build_grid(record, axes)
+    probs = predict_proba_tier(pipeline, grid, n_trees)[:, 1]
+
+    shape = [len(values) for values in axes.values()]
+    return {
+        "baseline": float(probs[-1]),
+        "probabilities": probs[:-1].astype(float).reshape(shape).round(4).tolist(),
+    }
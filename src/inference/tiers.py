@@ -0,0 +1,88 @@
+# src/inference/tiers.py
+
+FULL_TIER = "full"
+# Served by the compiled logistic-regression scorer, not the booster
+FALLBACK_TIER = "fallback"
+
+
+# -------------------------
+# Tier resolution
+# -------------------------
+def resolve_tiers(artifact: dict) -> dict:
+    """
+    Return {tier_name: n_trees} ordered from most to fewest trees.
+    n_trees=None means "use every boosting round" (artifacts saved
+    before tree profiling only expose the full tier).
+    """
+    tiers = artifact.get("tiers") or {FULL_TIER: None}
+    return dict(
+        sorted(
+            tiers.items(),
+            key=lambda item: float("inf") if item[1] is None else item[1],
+            reverse=True,
+        )
+    )
+
+
+def profiled_latency(profile: list, n_trees, n_rows: int = 1) -> float:
+    """
+    Latency (ms) recorded for n_trees scoring n_rows rows, or inf if
+    unknown. Rows cost the profiled batch latency per row, never less
+    than the single-row latency; profiles without a batch timing count
+    n_rows single-row calls.
+    """
+    if n_trees is None and profile:
+        n_trees = max(row["n_trees"] for row in profile)
+    for row in profile:
+        if row["n_trees"] != n_trees:
+            continue
+        if row.get("batch_latency_ms") is None or not row.get("batch_size"):
+            return row["latency_ms"] * n_rows
+        per_row = row["batch_latency_ms"] / row["batch_size"]
+        return max(row["latency_ms"], per_row * n_rows)
+    return float("inf")
+
+
+def tier_for_budget(
+    tiers: dict, profile: list, budget_ms: float, n_rows: int = 1
+) -> str:
+    """
+    Most precise tier whose profiled latency for n_rows fits the budget.
+    Falls back to the cheapest tier when nothing fits.
+    """
+    for name, n_trees in tiers.items():
+        if profiled_latency(profile, n_trees, n_rows) <= budget_ms:
+            return name
+    return list(tiers)[-1]
+
+
+def tier_for_load(tiers: dict, in_flight: int, overload_step: int) -> str:
+    """
+    Step one tier down for every `overload_step` requests in flight
+    """
+    names = list(tiers)
+    if overload_step <= 0:
+        return names[0]
+    level = max(in_flight - 1, 0) // overload_step
+    return names[min(level, len(names) - 1)]
+
+
+def queue_saturated(tiers: dict, in_flight: int, overload_step: int) -> bool:
+    """
+    True once load would step below the cheapest tier
+    """
+    if overload_step <= 0:
+        return False
+    return max(in_flight - 1, 0) // overload_step >= len(tiers)
+
+
+# -------------------------
+# Truncated scoring
+# -------------------------
+def predict_proba_tier(pipeline, df, n_trees=None):
+    """
+    Score with only the first n_trees boosting rounds of the booster
+    """
+    if n_trees is None:
+        return pipeline.predict_proba(df)
+    return pipeline.predict_proba(df, iteration_range=(0, n_trees))
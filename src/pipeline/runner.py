@@ -0,0 +1,218 @@
+# src/pipeline/runner.py
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+STATE_DIR = ".pipeline"
+STATE_PATH = os.path.join(STATE_DIR, "state.json")
+LOG_DIR = os.path.join(STATE_DIR, "logs")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One pipeline step, run as `python -m <module>`.
+
+    deps   -- files whose content the stage reads
+    params -- "module:NAME" values the stage reads (so editing one value
+              in a shared params file only invalidates its readers)
+    outs   -- files the stage writes
+    """
+
+    name: str
+    module: str
+    deps: tuple = ()
+    params: tuple = ()
+    outs: tuple = ()
+
+    @property
+    def source(self) -> str:
+        return self.module.replace(".", os.sep) + ".py"
+
+
+# -------------------------
+# Content hashing
+# -------------------------
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def param_value(spec: str):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def stage_hash(stage: Stage) -> str:
+    """
+    Hash of everything the stage reads: its own source, its input files
+    and its declared parameter values
+    """
+    digest = hashlib.sha256()
+    for path in (stage.source, *sorted(stage.deps)):
+        digest.update(path.encode())
+        digest.update(file_hash(path).encode() if os.path.exists(path) else b"-")
+    for spec in sorted(stage.params):
+        digest.update(f"{spec}={param_value(spec)!r}".encode())
+    return digest.hexdigest()
+
+
+def load_state() -> dict:
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def save_state(state: dict):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(STATE_PATH, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def is_fresh(stage: Stage, state: dict) -> bool:
+    recorded = state.get(stage.name)
+    if recorded is None:
+        return False
+    if not all(os.path.exists(path) for path in stage.outs):
+        return False
+    return recorded["hash"] == stage_hash(stage)
+
+
+# -------------------------
+# DAG
+# -------------------------
+def upstream(stages: list) -> dict:
+    """
+    {stage name: names of stages producing one of its deps}
+    """
+    producers = {}
+    for stage in stages:
+        for path in stage.outs:
+            producers.setdefault(path, []).append(stage.name)
+
+    graph = {}
+    for position, stage in enumerate(stages):
+        # Stages that rewrite a file in place only wait on earlier writers
+        earlier = {s.name for s in stages[:position]}
+        graph[stage.name] = {
+            name
+            for path in stage.deps
+            for name in producers.get(path, [])
+            if name != stage.name and (path not in stage.outs or name in earlier)
+        }
+    return graph
+
+
+def run_stage(stage: Stage) -> tuple:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage.name}.log")
+
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-m", stage.module],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    return result.returncode, time.perf_counter() - start, log_path
+
+
+def run(stages: list, jobs: int = 2, force: tuple = ()) -> dict:
+    """
+    Run stale stages, independent ones in parallel.
+    Returns {stage name: (status, seconds)}.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    graph = upstream(stages)
+    state = load_state()
+    results = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(results) < len(stages):
+            progressed = False
+            for name, stage in by_name.items():
+                if name in results or name in running.values():
+                    continue
+                parents = [results.get(parent) for parent in graph[name]]
+                if any(p is None for p in parents):
+                    continue
+                progressed = True
+                if any(p[0] in ("failed", "blocked") for p in parents):
+                    results[name] = ("blocked", 0.0)
+                elif name not in force and is_fresh(stage, state):
+                    results[name] = ("cached", 0.0)
+                else:
+                    print(f"▶ {name}")
+                    running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                if not progressed:
+                    raise ValueError("Pipeline stages form a cycle")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, seconds, log_path = future.result()
+
+                if returncode != 0:
+                    print(f"❌ {name} failed after {seconds:.1f}s, see {log_path}")
+                    results[name] = ("failed", seconds)
+                    continue
+
+                print(f"✅ {name} ({seconds:.1f}s)")
+                results[name] = ("ran", seconds)
+                state[name] = {
+                    "hash": stage_hash(by_name[name]),
+                    "duration_s": round(seconds, 3),
+                    "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }
+                save_state(state)
+
+    return results
+
+
+def print_summary(results: dict, state: dict):
+    print("\nStage              | Status  | Seconds | Last run (s)")
+    print("------------------------------------------------------")
+    for name, (status, seconds) in results.items():
+        last = state.get(name, {}).get("duration_s", float("nan"))
+        print(f"{name:18s} | {status:7s} | {seconds:7.1f} | {last:.1f}")
+
+
+def main(argv=None):
+    from src.pipeline.stages import STAGES
+
+    parser = argparse.ArgumentParser(description="Run the training pipeline")
+    parser.add_argument("stages", nargs="*", help="only these stages (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=2)
+    parser.add_argument(
+        "--force", nargs="*", default=[], help="re-run these stages even if cached"
+    )
+    args = parser.parse_args(argv)
+
+    stages = [s for s in STAGES if not args.stages or s.name in args.stages]
+
+    start = time.perf_counter()
+    results = run(stages, jobs=args.jobs, force=tuple(args.force))
+    print_summary(results, load_state())
+    print(f"\nTotal: {time.perf_counter() - start:.1f}s")
+
+    return 1 if any(status == "failed" for status, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# src/pipeline/stages.py
+
+from src.pipeline.runner import Stage
+
+RAW = "data/raw/diabetic_data.csv"
+TRAIN = "data/processed/train.parquet"
+TEST = "data/processed/test.parquet"
+ARTIFACT = "artifacts/final_model.joblib"
+BASELINE = "artifacts/baseline_model.joblib"
+PREPROCESSING = "src/features/preprocessing.py"
+HISTORY = "src/features/history.py"
+
+STAGES = [
+    Stage(
+        name="split",
+        module="src.data.load_and_split",
+        deps=(RAW,),
+        outs=(TRAIN, TEST),
+    ),
+    Stage(
+        name="baseline",
+        module="models.train_baseline",
+        deps=(TRAIN, TEST, PREPROCESSING, "src/inference/fallback.py"),
+        outs=(BASELINE,),
+    ),
+    Stage(
+        name="xgb_optuna",
+        module="models.train_xgb_optuna",
+        deps=(TRAIN, TEST, PREPROCESSING),
+    ),
+    Stage(
+        name="train_final_model",
+        module="models.train_final_model",
+        deps=(
+            TRAIN,
+            TEST,
+            PREPROCESSING,
+            HISTORY,
+            BASELINE,
+            "src/inference/tiers.py",
+        ),
+        params=(
+            "models.params:XGB_PARAMS",
+            "models.params:USE_HISTORY_FEATURES",
+            "models.params:ENCODING",
+        ),
+        outs=(ARTIFACT,),
+    ),
+    Stage(
+        name="apply_threshold",
+        module="models.apply_threshold",
+        deps=(ARTIFACT,),
+        params=("models.params:FINAL_THRESHOLD",),
+        outs=(ARTIFACT,),
+    ),
+    Stage(
+        name="threshold_tuning",
+        module="models.threshold_tuning",
+        deps=(TEST, ARTIFACT, HISTORY),
+    ),
+    Stage(
+        name="final_evaluation",
+        module="models.final_evaluation",
+        deps=(TEST, ARTIFACT, HISTORY),
+    ),
+]
@@ -0,0 +1,66 @@
+# src/profiling/run.py
+"""
+Run a training script's main() under the sampling profiler.
+
+    python -m src.profiling.run models.train_final_model --out profiles
+    python -m src.profiling.run models.train_final_model -- --encoding native
+
+Arguments after "--" are passed to the profiled module's main().
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from src.profiling.stacks import StackSampler, stage_summary, write_folded
+
+
+def profile_main(module_name: str, out_dir: str = "profiles", interval=0.005, argv=()):
+    module = importlib.import_module(module_name)
+
+    # The module's own argparse must see its arguments, not ours
+    saved_argv = sys.argv
+    sys.argv = [module_name, *argv]
+    try:
+        start = time.perf_counter()
+        with StackSampler(interval=interval) as sampler:
+            module.main()
+        wall = time.perf_counter() - start
+    finally:
+        sys.argv = saved_argv
+
+    name = module_name.rsplit(".", 1)[-1]
+    path = os.path.join(out_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+    write_folded(sampler.counts, path)
+
+    summary = stage_summary(sampler.counts)
+    total = sum(summary.values()) or 1
+
+    print(f"\n===== PROFILE: {module_name} ({wall:.1f}s wall) =====\n")
+    print("Stage             | Seconds | Share")
+    print("-----------------------------------")
+    for stage, samples in summary.most_common():
+        share = samples / total
+        print(f"{stage:17s} | {share * wall:7.2f} | {share:5.1%}")
+    print("\nFolded stacks:", path)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("module", help="e.g. models.train_final_model")
+    parser.add_argument("--out", default="profiles")
+    parser.add_argument("--interval", type=float, default=0.005)
+    parser.add_argument(
+        "module_args", nargs="*", help='arguments for the module, after "--"'
+    )
+    args = parser.parse_args()
+
+    profile_main(args.module, args.out, args.interval, args.module_args)
+
+
+if __name__ == "__main__":
+    main()
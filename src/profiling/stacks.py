@@ -0,0 +1,160 @@
+# src/profiling/stacks.py
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# A stack is a root-first tuple of (filename, function, first line) frames.
+# Both profilers accumulate {stack: weight} and write it as folded stacks
+# ("a;b;c weight" per line), the input format of flamegraph.pl / speedscope.
+
+
+def frame_key(code) -> tuple:
+    return (code.co_filename, code.co_name, code.co_firstlineno)
+
+
+def frame_label(frame: tuple) -> str:
+    filename, name, lineno = frame
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def write_folded(counts: Counter, path: str) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for stack, weight in counts.most_common():
+            f.write(";".join(frame_label(frame) for frame in stack))
+            f.write(f" {weight}\n")
+    return path
+
+
+def prune_folded(directory: str, keep: int) -> int:
+    """
+    Delete all but the `keep` newest .folded files; returns how many
+    were deleted
+    """
+    files = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".folded"):
+            try:
+                files.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:  # pruned by another worker
+                continue
+
+    removed = 0
+    for _, path in sorted(files)[: max(len(files) - keep, 0)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+# -------------------------
+# Exact per-thread tracer
+# -------------------------
+class TraceProfiler:
+    """
+    Deterministic profiler for the calling thread only (sys.setprofile).
+    Weights are self time in microseconds. Meant for short, opt-in
+    captures such as a single request.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self._stack = []
+
+    def _profile(self, frame, event, arg):
+        now = time.perf_counter_ns()
+
+        if event == "call":
+            self._stack.append([frame_key(frame.f_code), now, 0])
+        elif event == "c_call":
+            module = getattr(arg, "__module__", None) or "<builtin>"
+            self._stack.append([(module, arg.__qualname__, 0), now, 0])
+        elif event in ("return", "c_return", "c_exception") and self._stack:
+            stack = tuple(entry[0] for entry in self._stack)
+            _, start, child = self._stack.pop()
+            elapsed = now - start
+            self.counts[stack] += (elapsed - child) // 1000
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def __enter__(self):
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+        return False
+
+
+# -------------------------
+# Sampling profiler
+# -------------------------
+class StackSampler:
+    """
+    Samples one thread's stack from a background thread every `interval`
+    seconds. Weights are sample counts. Low overhead, for long runs.
+    """
+
+    def __init__(self, thread_id=None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_key(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+# -------------------------
+# Per-stage summary
+# -------------------------
+# First matching rule wins; a rule matches when any frame's path
+# contains `path` and its function name is in `names` (or names is None).
+STAGE_RULES = [
+    ("metrics", "sklearn/metrics", None),
+    ("model fit", "xgboost", ("fit", "train")),
+    ("model fit", "sklearn/linear_model", ("fit",)),
+    ("preprocessing fit", "sklearn", ("fit_transform", "fit")),
+    ("inference", "sklearn", ("predict_proba", "predict")),
+    ("inference", "xgboost", ("predict_proba", "predict", "inplace_predict")),
+    ("data load", "pandas/io", None),
+]
+
+
+def classify(stack: tuple) -> str:
+    for stage, path, names in STAGE_RULES:
+        for filename, name, _ in stack:
+            if path in filename.replace(os.sep, "/") and (
+                names is None or name in names
+            ):
+                return stage
+    return "other"
+
+
+def stage_summary(counts: Counter) -> Counter:
+    summary = Counter()
+    for stack, weight in counts.items():
+        summary[classify(stack)] += weight
+    return summary
@@ -15,14 +15,30 @@ def mock_joblib_load(monkeypatch):
     version / category issues during tests.
     """
 
+    class MockPreprocessor:
+        def transform(self, X):
+            return np.ones((len(X), 4))
+
     class MockPipeline:
-        def predict_proba(self, X):
+        def __init__(self):
+            self.named_steps = {"preprocessing": MockPreprocessor(), "model": self}
+
+        def predict_proba(self, X, **params):
             # return deterministic probability for tests
             # shape: (n_samples, 2)
-            return np.array([[0.25, 0.75] for _ in range(len(X))])
+            return np.array([[0.25, 0.75] for _ in range(X.shape[0])])
 
     def fake_load(path):
-        return {"pipeline": MockPipeline(), "threshold": 0.45}
+        return {
+            "pipeline": MockPipeline(),
+            "threshold": 0.45,
+            "tree_profile": [
+                {"n_trees": 50, "roc_auc": 0.66, "latency_ms": 1.0},
+                {"n_trees": 200, "roc_auc": 0.68, "latency_ms": 2.0},
+                {"n_trees": 571, "roc_auc": 0.69, "latency_ms": 4.0},
+            ],
+            "tiers": {"full": 571, "balanced": 200, "fast": 50},
+        }
 
     # Apply monkeypatch to joblib.load globally for tests
     monkeypatch.setattr(joblib, "load", fake_load)
@@ -30,6 +46,32 @@ def mock_joblib_load(monkeypatch):
     # monkeypatch auto-reverts after each test
 
 
+@pytest.fixture
+def payload():
+    return {
+        "age": "[60-70)",
+        "gender": "Male",
+        "race": "Caucasian",
+        "admission_type_id": 1,
+        "discharge_disposition_id": 1,
+        "admission_source_id": 7,
+        "time_in_hospital": 3,
+        "num_lab_procedures": 45,
+        "num_procedures": 1,
+        "num_medications": 13,
+        "number_outpatient": 0,
+        "number_emergency": 0,
+        "number_inpatient": 0,
+        "number_diagnoses": 5,
+        "insulin": "No",
+        "diabetesMed": "Yes",
+        "change": "No",
+        "diag_1": "250.83",
+        "diag_2": "401.9",
+        "diag_3": "276",
+    }
+
+
 @pytest.fixture
 def client():
     """
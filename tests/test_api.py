@@ -31,3 +31,138 @@ def test_predict_endpoint(client):
     assert "prediction" in body
     assert 0 <= body["readmission_probability"] <= 1
     assert body["prediction"] in (0, 1)
+
+
+def test_predict_reports_tier(client, payload):
+    response = client.post("/predict", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["tier"] == "full"
+
+
+def test_predict_explicit_tier(client, payload):
+    response = client.post("/predict", params={"tier": "fast"}, json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["tier"] == "fast"
+
+
+def test_predict_unknown_tier(client, payload):
+    response = client.post("/predict", params={"tier": "turbo"}, json=payload)
+
+    assert response.status_code == 422
+
+
+def test_predict_latency_budget(client, payload, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "queued_ms", lambda request: 0.0)
+    response = client.post("/predict", params={"latency_budget_ms": 2.5}, json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["tier"] == "balanced"
+
+
+def test_predict_latency_budget_minus_queue_wait(client, payload, monkeypatch):
+    from app import main
+
+    # 1.5 ms left of 5: only the 1 ms tier still fits
+    monkeypatch.setattr(main, "queued_ms", lambda request: 3.5)
+    response = client.post("/predict", params={"latency_budget_ms": 5}, json=payload)
+
+    assert response.json()["tier"] == "fast"
+
+
+def test_latency_budget_scales_with_batch_size(client, payload, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "queued_ms", lambda request: 0.0)
+    # 256-row batches cost 0.1 / 0.2 / 0.4 ms per row
+    profile = [
+        dict(row, batch_size=256, batch_latency_ms=row["latency_ms"] * 25.6)
+        for row in main.app.state.tree_profile
+    ]
+    monkeypatch.setattr(main.app.state, "tree_profile", profile)
+
+    params = {"latency_budget_ms": 10}
+    one = client.post("/predict/batch", params=params, json=[payload])
+    many = client.post("/predict/batch", params=params, json=[payload] * 40)
+
+    # 40 rows on the full tier would take ~16 ms
+    assert one.json()["tier"] == "full"
+    assert many.json()["tier"] == "balanced"
+
+
+def test_ready_after_startup(client):
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["startup_ms"]) == {"imports", "unpickle", "warmup"}
+
+
+def test_not_ready_without_model(client):
+    from app.main import app
+
+    app.state.ready = False
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+
+
+def test_predict_profiled_with_admin_token(client, payload, monkeypatch, tmp_path):
+    from app import main
+
+    monkeypatch.setattr(main, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(main, "PROFILE_DIR", str(tmp_path))
+
+    response = client.post(
+        "/predict", json=payload, headers={"X-Profile-Token": "s3cret"}
+    )
+
+    assert response.status_code == 200
+    folded = tmp_path / response.headers["X-Profile-Path"].split("/")[-1]
+    assert folded.read_text().strip()
+
+
+def test_sampled_profile_path_not_returned(client, payload, monkeypatch, tmp_path):
+    from app import main
+
+    monkeypatch.setattr(main, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(main, "PROFILE_MAX_FILES", 2)
+    monkeypatch.setattr(main, "PROFILE_DIR", str(tmp_path))
+
+    for _ in range(4):
+        response = client.post("/predict", json=payload)
+        assert "X-Profile-Path" not in response.headers
+
+    # Traced, but only the newest profiles are kept
+    assert len(list(tmp_path.glob("*.folded"))) == 2
+
+
+def test_predict_not_profiled_by_default(client, payload, monkeypatch, tmp_path):
+    from app import main
+
+    monkeypatch.setattr(main, "PROFILE_DIR", str(tmp_path))
+
+    response = client.post("/predict", json=payload, headers={"X-Profile-Token": "x"})
+
+    assert "X-Profile-Path" not in response.headers
+    assert not list(tmp_path.iterdir())
+
+
+def test_predict_batch(client, payload):
+    response = client.post("/predict/batch", json=[payload, payload, payload])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["predictions"]) == 3
+    assert body["predictions"][0]["prediction"] in (0, 1)
+    assert body["tier"] == "full"
+
+
+def test_predict_batch_rejects_empty(client):
+    response = client.post("/predict/batch", json=[])
+
+    assert response.status_code == 422
@@ -0,0 +1,188 @@
+# tests/test_audit.py
+import threading
+import time
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.inference.audit import AuditSink
+
+
+def audit_record(i):
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "endpoint": "/predict",
+        "model_version": "test",
+        "tier": "full",
+        "degraded": False,
+        "threshold": 0.45,
+        "probability": 0.5,
+        "prediction": 1,
+        "latency_ms": 1.0,
+        "inputs": {"i": i},
+    }
+
+
+def read_inputs(directory):
+    tables = [pq.read_table(path) for path in sorted(directory.glob("*.parquet"))]
+    return [row for table in tables for row in table.column("inputs").to_pylist()]
+
+
+def test_flushes_on_close(tmp_path):
+    sink = AuditSink(str(tmp_path), flush_interval_s=60)
+    for i in range(5):
+        assert sink.submit(audit_record(i))
+    sink.close()
+
+    assert read_inputs(tmp_path) == [f'{{"i": {i}}}' for i in range(5)]
+    assert not list(tmp_path.glob("*.inprogress"))
+    assert sink.stats()["written"] == 5
+
+
+def test_rotates_by_size(tmp_path):
+    sink = AuditSink(str(tmp_path), batch_size=1, max_file_bytes=1)
+    for i in range(3):
+        sink.submit(audit_record(i))
+    sink.close()
+
+    assert len(sink.files) == 3
+    assert len(read_inputs(tmp_path)) == 3
+
+
+@pytest.mark.parametrize(
+    "policy, kept",
+    [("drop_newest", [0, 1, 2]), ("drop_oldest", [0, 2, 3]), ("block", [0, 1, 2])],
+)
+def test_full_queue_policy(tmp_path, policy, kept):
+    sink = AuditSink(str(tmp_path), policy=policy, max_queue=2, batch_size=1)
+
+    # Stall the writer on the first record so the queue fills up
+    gate = threading.Event()
+    write = sink._write
+    sink._write = lambda batch: gate.wait() and write(batch)
+
+    sink.submit(audit_record(0))
+    while sink.stats()["queued"]:
+        time.sleep(0.001)
+    results = [sink.submit(audit_record(i)) for i in (1, 2, 3)]
+
+    gate.set()
+    sink.close()
+
+    assert results[-1] == (policy == "drop_oldest")
+    assert sink.dropped == 1
+    assert read_inputs(tmp_path) == [f'{{"i": {i}}}' for i in kept]
+
+
+def test_close_does_not_hang_on_stuck_writer(tmp_path):
+    sink = AuditSink(str(tmp_path), max_queue=1, batch_size=1)
+    gate = threading.Event()
+    sink._write = lambda batch: gate.wait()
+
+    sink.submit(audit_record(0))
+    while sink.stats()["queued"]:
+        time.sleep(0.001)
+    sink.submit(audit_record(1))
+
+    start = time.monotonic()
+    sink.close(timeout=0.1)
+    assert time.monotonic() - start < 1
+    gate.set()
+
+
+def test_idle_rotation_failure_keeps_writer(tmp_path, capsys):
+    sink = AuditSink(
+        str(tmp_path), batch_size=1, flush_interval_s=0.01, max_file_age_s=0.05
+    )
+    close_file = sink._close_file
+    failures = []
+
+    def fail_once():
+        if not failures:
+            failures.append(1)
+            raise OSError("disk full")
+        close_file()
+
+    sink._close_file = fail_once
+    sink.submit(audit_record(0))
+    while not failures:
+        time.sleep(0.01)
+
+    # The writer thread survived and still writes later records
+    assert sink.submit(audit_record(1))
+    sink.close()
+    assert not sink._thread.is_alive()
+    assert read_inputs(tmp_path) == ['{"i": 1}']
+    assert "Audit log close failed: disk full" in capsys.readouterr().out
+
+
+def test_predict_is_audited(tmp_path, monkeypatch, payload):
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    monkeypatch.setattr(main, "AUDIT_LOG_DIR", str(tmp_path))
+    with TestClient(main.app) as client:
+        client.post("/predict/batch", json=[payload, payload])
+
+    table = pq.read_table(next(tmp_path.glob("*.parquet")))
+    assert table.num_rows == 2
+    assert table.column("endpoint").to_pylist() == ["/predict/batch"] * 2
+    assert table.column("probability").to_pylist() == [0.75, 0.75]
+
+
+def test_audit_stores_scored_features(tmp_path, monkeypatch, payload):
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    def with_history(record):
+        return dict(record, prior_encounters=2, days_since_last_discharge=float("nan"))
+
+    monkeypatch.setattr(main, "AUDIT_LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "with_history", with_history)
+    with TestClient(main.app) as client:
+        client.post("/predict", json=payload)
+        client.post(
+            "/predict/sensitivity",
+            json={"patient": payload, "axes": [{"field": "insulin", "values": ["Up"]}]},
+        )
+
+    table = pq.read_table(next(tmp_path.glob("*.parquet")))
+    assert table.column("endpoint").to_pylist() == ["/predict", "/predict/sensitivity"]
+
+    scored, swept = [json.loads(row) for row in read_inputs(tmp_path)]
+    assert scored["prior_encounters"] == 2
+    assert scored["days_since_last_discharge"] is None
+    assert swept["sweep_axes"] == {"insulin": ["Up"]}
+
+
+def test_predict_by_id_audits_stored_row(tmp_path, monkeypatch):
+    import json
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from scipy import sparse
+
+    from app import main
+    from src.features.store import FeatureStore, artifact_fingerprint
+
+    store = FeatureStore(str(tmp_path / "fs.sqlite"))
+    X = sparse.csr_matrix(np.array([[0.0, 1.5, 0.0, 2.0]]))
+    store.upsert([100], [7], X, artifact_fingerprint())
+    store.close()
+
+    monkeypatch.setattr(main, "FEATURE_STORE_PATH", str(tmp_path / "fs.sqlite"))
+    monkeypatch.setattr(main, "AUDIT_LOG_DIR", str(tmp_path / "audit"))
+    with TestClient(main.app) as client:
+        client.post("/predict/by-id", json={"encounter_ids": [100]})
+
+    (row,) = [json.loads(row) for row in read_inputs(tmp_path / "audit")]
+    assert row == {
+        "encounter_id": 100,
+        "feature_index": [1, 3],
+        "feature_value": [1.5, 2.0],
+    }
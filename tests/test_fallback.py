@@ -0,0 +1,111 @@
+# tests/test_fallback.py
+import random
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from benchmarks.loadtest import synthetic_patient
+from src.features.preprocessing import build_preprocessing_pipeline
+from src.inference.fallback import compile_scorer
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = random.Random(0)
+    records = [synthetic_patient(rng) for _ in range(400)]
+    y = [rng.random() < 0.3 for _ in records]
+
+    pipeline = Pipeline(
+        [
+            ("preprocessing", build_preprocessing_pipeline()),
+            ("model", LogisticRegression(max_iter=2000)),
+        ]
+    )
+    pipeline.fit(pd.DataFrame(records), y)
+    return pipeline, records
+
+
+def test_compiled_scorer_matches_pipeline(fitted):
+    pipeline, records = fitted
+    scorer = compile_scorer(pipeline)
+
+    expected = pipeline.predict_proba(pd.DataFrame(records))
+    np.testing.assert_allclose(scorer.predict_proba(records), expected, atol=1e-9)
+
+
+def test_compiled_scorer_unknown_and_missing(fitted):
+    pipeline, records = fitted
+    scorer = compile_scorer(pipeline)
+    record = dict(records[0], race="Martian", insulin=None, num_medications=None)
+
+    expected = pipeline.predict_proba(pd.DataFrame([record]))
+    np.testing.assert_allclose(scorer.predict_proba([record]), expected, atol=1e-9)
+
+
+@pytest.fixture
+def fallback_client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    fake_load = joblib.load
+
+    class ConstantScorer:
+        threshold = 0.05
+
+        def predict_proba(self, records):
+            return np.array([[0.9, 0.1] for _ in records])
+
+    def load_with_fallback(path):
+        return dict(fake_load(path), fallback=ConstantScorer())
+
+    monkeypatch.setattr(joblib, "load", load_with_fallback)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_predict_explicit_fallback(fallback_client, payload):
+    response = fallback_client.post(
+        "/predict", params={"tier": "fallback"}, json=payload
+    )
+
+    body = response.json()
+    assert body["tier"] == "fallback"
+    assert body["degraded"] is True
+    assert body["readmission_probability"] == 0.1
+    assert body["prediction"] == 1
+
+
+def test_predict_fallback_past_deadline(fallback_client, payload):
+    response = fallback_client.post(
+        "/predict", params={"latency_budget_ms": 0.5}, json=payload
+    )
+
+    assert response.json()["tier"] == "fallback"
+
+
+def test_predict_fallback_when_saturated(fallback_client, payload, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "TIER_OVERLOAD_STEP", 1)
+    monkeypatch.setattr(main.app.state, "in_flight", 10)
+
+    response = fallback_client.post("/predict/batch", json=[payload])
+
+    assert response.json()["degraded"] is True
+
+
+def test_predict_not_degraded_by_default(fallback_client, payload):
+    response = fallback_client.post("/predict", json=payload)
+
+    assert response.json()["degraded"] is False
+
+
+def test_fallback_tier_needs_fallback_model(client, payload):
+    response = client.post("/predict", params={"tier": "fallback"}, json=payload)
+
+    assert response.status_code == 422
@@ -0,0 +1,127 @@
+# tests/test_feature_store.py
+import numpy as np
+import pytest
+from scipy import sparse
+
+from src.features.store import FeatureStore, artifact_fingerprint
+
+
+def test_store_round_trips_sparse_rows(tmp_path):
+    store = FeatureStore(str(tmp_path / "fs.sqlite"))
+    X = sparse.csr_matrix(np.array([[0.0, 1.5, 0.0], [2.0, 0.0, -1.0]]))
+
+    store.upsert([10, 11], [1, 1], X, "abc")
+    found, rows = store.get([11, 99, 10])
+
+    assert found == [11, 10]
+    assert sparse.issparse(rows)
+    assert rows.nnz == 3
+    np.testing.assert_array_equal(rows.toarray(), X.toarray()[[1, 0]])
+    assert store.encounters_for_patient(1) == [10, 11]
+
+
+def test_store_upsert_replaces_and_checks_layout(tmp_path):
+    store = FeatureStore(str(tmp_path / "fs.sqlite"))
+
+    store.upsert([10], [1], np.array([[1.0, 0.0]]), "abc")
+    store.upsert([10], [2], np.array([[3.0, 0.0]]), "abc")
+    found, rows = store.get([10])
+
+    np.testing.assert_array_equal(rows, [[3.0, 0.0]])
+    assert store.encounters_for_patient(2) == [10]
+
+    with pytest.raises(ValueError):
+        store.upsert([12], [1], np.array([[1.0, 0.0, 0.0]]), "abc")
+
+
+@pytest.fixture
+def store_client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    path = tmp_path / "fs.sqlite"
+    store = FeatureStore(str(path))
+    store.upsert([100, 101], [7, 7], np.ones((2, 4)), artifact_fingerprint())
+    store.close()
+
+    monkeypatch.setattr(main, "FEATURE_STORE_PATH", str(path))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_predict_by_id(store_client):
+    response = store_client.post("/predict/by-id", json={"encounter_ids": [101, 555]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["encounter_id"] for p in body["predictions"]] == [101]
+    assert body["missing"] == [555]
+
+
+def test_predict_by_id_budget_minus_queue_wait(store_client, monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "queued_ms", lambda request: 3.5)
+    response = store_client.post(
+        "/predict/by-id",
+        params={"latency_budget_ms": 5},
+        json={"encounter_ids": [101]},
+    )
+
+    assert response.json()["tier"] == "fast"
+
+
+def test_predict_by_patient(store_client):
+    response = store_client.post("/predict/by-id", json={"patient_nbr": 7})
+
+    assert [p["encounter_id"] for p in response.json()["predictions"]] == [100, 101]
+
+
+def test_upsert_then_predict_by_id(store_client, payload):
+    encounter = dict(payload, encounter_id=200, patient_nbr=8)
+
+    response = store_client.post("/encounters", json=[encounter])
+    assert response.json() == {"upserted": 1}
+
+    response = store_client.post("/predict/by-id", json={"encounter_ids": [200]})
+    assert response.status_code == 200
+
+
+def test_predict_by_id_unknown(store_client):
+    response = store_client.post("/predict/by-id", json={"encounter_ids": [1]})
+
+    assert response.status_code == 404
+
+
+def test_predict_by_id_without_store(client):
+    response = client.post("/predict/by-id", json={"encounter_ids": [1]})
+
+    assert response.status_code == 503
+
+
+def test_store_keyed_to_model_not_artifact_file(tmp_path, monkeypatch):
+    import joblib
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    path = tmp_path / "fs.sqlite"
+    store = FeatureStore(str(path))
+    store.upsert([100], [7], np.ones((1, 4)), "model-a")
+    store.close()
+    monkeypatch.setattr(main, "FEATURE_STORE_PATH", str(path))
+
+    fake_load = joblib.load
+    for model, threshold, status in (("model-a", 0.3, 200), ("model-b", 0.45, 503)):
+        # A re-saved threshold keeps the store; a refitted model does not
+        monkeypatch.setattr(
+            joblib,
+            "load",
+            lambda p, model=model, threshold=threshold: dict(
+                fake_load(p), model_id=model, threshold=threshold
+            ),
+        )
+        with TestClient(main.app) as client:
+            response = client.post("/predict/by-id", json={"encounter_ids": [100]})
+        assert response.status_code == status
@@ -0,0 +1,238 @@
+# tests/test_history.py
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.history import (
+    HISTORY_FEATURES,
+    PatientHistoryStore,
+    add_history_features,
+)
+
+
+@pytest.fixture
+def encounters():
+    return pd.DataFrame(
+        {
+            "encounter_id": [30, 10, 20, 40, 50],
+            "patient_nbr": [1, 1, 2, 1, 2],
+            "time_in_hospital": [2, 3, 4, 1, 5],
+            "number_inpatient": [1, 0, 2, 3, 0],
+            "number_emergency": [0, 1, 0, 2, 1],
+        }
+    )
+
+
+def test_add_history_features(encounters):
+    out = add_history_features(encounters).set_index("encounter_id")
+
+    assert out.loc[[10, 30, 40], "prior_encounters"].tolist() == [0, 1, 2]
+    assert out.loc[[10, 30, 40], "cum_inpatient"].tolist() == [0, 0, 1]
+    assert out.loc[[20, 50], "cum_inpatient"].tolist() == [0, 2]
+    assert out["days_since_last_discharge"].isna().all()
+
+
+def test_days_since_last_discharge(encounters):
+    encounters["discharge_date"] = pd.to_datetime(
+        ["2024-01-20", "2024-01-05", "2024-02-01", "2024-03-01", "2024-02-11"]
+    )
+    out = add_history_features(encounters).set_index("encounter_id")
+
+    # Encounter 30 was admitted 2 days before its discharge on Jan 20
+    assert out.loc[30, "days_since_last_discharge"] == 13
+    assert out.loc[50, "days_since_last_discharge"] == 5
+    assert np.isnan(out.loc[10, "days_since_last_discharge"])
+
+
+def test_store_matches_vectorized(tmp_path, encounters):
+    encounters["discharge_date"] = pd.to_datetime(
+        ["2024-01-20", "2024-01-05", "2024-02-01", "2024-03-01", "2024-02-11"]
+    )
+    expected = add_history_features(encounters).set_index("encounter_id")
+
+    store = PatientHistoryStore(str(tmp_path / "history.sqlite"))
+    records = encounters.sort_values("discharge_date").to_dict("records")
+
+    # A batch sees its own earlier rows; a repeated encounter_id does not
+    batch = store.encounter_features(records + records[:1])
+    for record, features in zip(records + records[:1], batch):
+        row = expected.loc[record["encounter_id"], HISTORY_FEATURES]
+        assert features == pytest.approx(row.to_dict(), nan_ok=True)
+
+    for record in records:
+        features = store.features(record["patient_nbr"], record)
+        row = expected.loc[record["encounter_id"], HISTORY_FEATURES]
+        assert features == pytest.approx(row.to_dict(), nan_ok=True)
+        store.record_encounter(record["patient_nbr"], record)
+
+    # Bootstrapping from the full table lands in the same end state
+    replay = store.features(1, {"time_in_hospital": 1})
+    assert store.bootstrap(encounters) == 2
+    assert store.features(1, {"time_in_hospital": 1}) == replay
+    store.close()
+
+
+def test_concurrent_recording_is_serialized(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    first, second = PatientHistoryStore(path), PatientHistoryStore(path)
+    visit = {"patient_nbr": 3, "number_inpatient": 1, "number_emergency": 0}
+
+    # Another worker recording the same patient waits for the open
+    # transaction and then sees it, instead of reading the same state
+    result = {}
+    with first.recording([dict(visit, encounter_id=1)]) as features:
+        worker = threading.Thread(
+            target=lambda: result.update(
+                features=second.record_encounters([dict(visit, encounter_id=2)])
+            )
+        )
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+    worker.join()
+
+    assert features[0]["prior_encounters"] == 0
+    assert result["features"][0]["prior_encounters"] == 1
+
+    with pytest.raises(RuntimeError):
+        with first.recording([dict(visit, encounter_id=3)]):
+            raise RuntimeError("upsert failed")
+    assert first.features(3, visit)["prior_encounters"] == 2
+    first.close()
+    second.close()
+
+
+def test_store_upsert_continues_recorded_history(tmp_path, encounters):
+    from src.features.store import FeatureStore, load_into_store
+
+    class HistoryColumns:
+        def transform(self, X):
+            return X[["prior_encounters", "cum_inpatient"]].to_numpy(float)
+
+    class Pipeline:
+        named_steps = {"preprocessing": HistoryColumns()}
+
+    history = PatientHistoryStore(str(tmp_path / "history.sqlite"))
+    history.bootstrap(encounters)
+    later = pd.DataFrame(
+        {
+            "encounter_id": [70, 60],
+            "patient_nbr": [1, 1],
+            "time_in_hospital": [1, 1],
+            "number_inpatient": [4, 1],
+            "number_emergency": [0, 0],
+        }
+    )
+    later.to_parquet(tmp_path / "later.parquet")
+
+    store = FeatureStore(str(tmp_path / "fs.sqlite"))
+    for _ in range(2):
+        load_into_store(
+            store,
+            Pipeline(),
+            [str(tmp_path / "later.parquet")],
+            "model",
+            history=True,
+            history_store=history,
+        )
+
+    # Patient 1 had 3 encounters and 4 inpatient visits on record; a
+    # re-run of the same file is not counted again
+    ids, X = store.get([60, 70])
+    assert X.tolist() == [[3, 4], [4, 5]]
+    assert history.features(1, {"time_in_hospital": 1})["prior_encounters"] == 5
+    store.close()
+    history.close()
+
+
+@pytest.fixture
+def history_client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from src.features.store import FeatureStore, artifact_fingerprint
+
+    seen = []
+    fake_load = joblib.load
+
+    class RecordingPreprocessing:
+        def transform(self, X):
+            seen.append(X)
+            return np.ones((X.shape[0], 4))
+
+    class RecordingPipeline:
+        named_steps = {"preprocessing": RecordingPreprocessing()}
+
+        def predict_proba(self, X, **params):
+            seen.append(X)
+            return np.array([[0.25, 0.75] for _ in range(X.shape[0])])
+
+    def load_with_history(path):
+        artifact = fake_load(path)
+        artifact["pipeline"] = RecordingPipeline()
+        artifact["history_features"] = HISTORY_FEATURES
+        return artifact
+
+    monkeypatch.setattr(joblib, "load", load_with_history)
+    monkeypatch.setattr(main, "HISTORY_STORE_PATH", str(tmp_path / "h.sqlite"))
+
+    store = PatientHistoryStore(str(tmp_path / "h.sqlite"))
+    store.record_encounter(7, {"number_inpatient": 2, "number_emergency": 1})
+    store.close()
+
+    features = FeatureStore(str(tmp_path / "fs.sqlite"))
+    features.upsert([1], [1], np.ones((1, 4)), artifact_fingerprint())
+    features.close()
+    monkeypatch.setattr(main, "FEATURE_STORE_PATH", str(tmp_path / "fs.sqlite"))
+
+    with TestClient(main.app) as client:
+        seen.clear()
+        yield client, seen
+
+
+def test_predict_adds_history(history_client, payload):
+    client, seen = history_client
+
+    batch = [dict(payload, patient_nbr=7), payload]
+    response = client.post("/predict/batch", json=batch)
+
+    assert response.status_code == 200
+    X = seen[-1]
+    assert X["prior_encounters"].tolist() == [1, 0]
+    assert X["cum_inpatient"].tolist() == [2, 0]
+
+
+def test_encounter_posted_twice_counts_once(history_client, payload):
+    client, seen = history_client
+    encounter = dict(payload, encounter_id=500, patient_nbr=7)
+
+    for _ in range(2):
+        response = client.post("/encounters", json=[encounter])
+        assert response.json() == {"upserted": 1}
+        # The retry is featurized with the history it was first recorded with
+        assert seen[-1]["prior_encounters"].tolist() == [1]
+
+    client.post("/predict", json=dict(payload, patient_nbr=7))
+    assert seen[-1]["prior_encounters"].tolist() == [2]
+    assert seen[-1]["cum_inpatient"].tolist() == [2 + payload["number_inpatient"]]
+
+
+def test_failed_upsert_leaves_history_unchanged(history_client, payload, monkeypatch):
+    from app import main
+
+    client, seen = history_client
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(main.app.state.feature_store, "upsert", fail)
+    with pytest.raises(RuntimeError):
+        client.post(
+            "/encounters", json=[dict(payload, encounter_id=501, patient_nbr=7)]
+        )
+
+    client.post("/predict", json=dict(payload, patient_nbr=7))
+    assert seen[-1]["prior_encounters"].tolist() == [1]
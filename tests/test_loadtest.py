@@ -0,0 +1,56 @@
+# tests/test_loadtest.py
+import random
+
+from app.main import PatientData
+from benchmarks.loadtest import main, regressions, synthetic_patient
+
+BASE = {
+    "requests_per_s": 100.0,
+    "p95_ms": 20.0,
+    "p99_ms": 30.0,
+    "errors": 0,
+    "tier": "full",
+    "tiers": {"full": 1000},
+    "degraded": 0,
+}
+
+
+def test_synthetic_patient_is_valid_payload():
+    PatientData(**synthetic_patient(random.Random(0)))
+
+
+def test_regressions_within_tolerance():
+    result = dict(BASE, requests_per_s=85.0, p99_ms=35.0)
+
+    assert regressions({"single@1": result}, {"single@1": BASE}, 0.2) == []
+
+
+def test_regressions_flags_slowdown():
+    result = dict(BASE, requests_per_s=70.0, p95_ms=30.0)
+
+    failures = regressions({"single@1": result}, {"single@1": BASE}, 0.2)
+
+    assert len(failures) == 2
+    assert regressions({"batch@8": result}, {"single@1": BASE}, 0.2) == []
+
+
+def test_regressions_flags_quality_drop():
+    auto = dict(BASE, tier="auto", tiers={"full": 900, "fast": 100})
+    shed = dict(auto, tiers={"full": 500, "fallback": 500}, degraded=500)
+
+    failures = regressions({"single@32": shed}, {"single@32": auto}, 0.2)
+
+    assert len(failures) == 3
+    assert "degraded" in failures[0]
+
+
+def test_regressions_needs_same_tier_baseline():
+    legacy = {k: v for k, v in BASE.items() if k not in ("tier", "tiers", "degraded")}
+
+    failures = regressions({"single@1": BASE}, {"single@1": legacy}, 0.2)
+
+    assert failures and "re-record" in failures[0]
+
+
+def test_missing_baseline_fails_the_gate(tmp_path):
+    assert main(["--baseline", str(tmp_path / "missing.json")]) == 1
@@ -0,0 +1,27 @@
+# tests/test_native_categorical.py
+import random
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.loadtest import synthetic_patient
+from models.train_final_model import build_model_pipeline
+from src.features.preprocessing import native_feature_types
+
+
+def test_native_encoding_pipeline():
+    rng = random.Random(0)
+    X = pd.DataFrame([synthetic_patient(rng) for _ in range(300)])
+    y = [rng.random() < 0.3 for _ in range(len(X))]
+
+    pipeline = build_model_pipeline("native", history=False)
+    pipeline.set_params(model__n_estimators=5)
+    pipeline.fit(X, y)
+
+    features = pipeline.named_steps["preprocessing"].transform(X)
+    assert features.shape[1] == len(native_feature_types())
+
+    # Unseen categories are encoded as missing rather than rejected
+    unseen = X.iloc[[0]].assign(race="Martian", admission_type_id=99)
+    assert np.isnan(pipeline.named_steps["preprocessing"].transform(unseen)).any()
+    assert 0 <= pipeline.predict_proba(unseen)[0, 1] <= 1
@@ -0,0 +1,34 @@
+# tests/test_pipeline.py
+from src.pipeline.runner import Stage, run, upstream
+from src.pipeline.stages import STAGES
+
+
+def test_stage_graph():
+    graph = upstream(STAGES)
+
+    assert graph["split"] == set()
+    assert graph["baseline"] == graph["xgb_optuna"] == {"split"}
+    assert graph["apply_threshold"] == {"train_final_model"}
+    assert graph["final_evaluation"] == {
+        "split",
+        "train_final_model",
+        "apply_threshold",
+    }
+
+
+def test_run_skips_unchanged_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "copy_input.py").write_text(
+        "open('out.txt', 'w').write(open('in.txt').read())\n"
+    )
+    (tmp_path / "in.txt").write_text("a")
+    stages = [
+        Stage(name="copy", module="copy_input", deps=("in.txt",), outs=("out.txt",))
+    ]
+
+    assert run(stages)["copy"][0] == "ran"
+    assert run(stages)["copy"][0] == "cached"
+
+    (tmp_path / "in.txt").write_text("b")
+    assert run(stages)["copy"][0] == "ran"
+    assert (tmp_path / "out.txt").read_text() == "b"
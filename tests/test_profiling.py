@@ -0,0 +1,84 @@
+# tests/test_profiling.py
+import os
+import sys
+from collections import Counter
+
+from src.profiling.run import profile_main
+from src.profiling.stacks import (
+    StackSampler,
+    TraceProfiler,
+    classify,
+    prune_folded,
+    stage_summary,
+    write_folded,
+)
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_trace_profiler_records_calls(tmp_path):
+    with TraceProfiler() as profiler:
+        busy(10_000)
+
+    assert any(frame[1] == "busy" for stack in profiler.counts for frame in stack)
+
+    path = write_folded(profiler.counts, str(tmp_path / "trace.folded"))
+    line = open(path).readline()
+    assert ";" in line or "(" in line
+    assert line.rsplit(" ", 1)[1].strip().isdigit()
+
+
+def test_stack_sampler_collects_samples():
+    with StackSampler(interval=0.001) as sampler:
+        busy(2_000_000)
+
+    assert sum(sampler.counts.values()) > 0
+
+
+def test_stage_summary():
+    fit = ("/site-packages/xgboost/sklearn.py", "fit", 1)
+    metrics = ("/site-packages/sklearn/metrics/_ranking.py", "roc_auc_score", 1)
+    load = ("/site-packages/pandas/io/parquet.py", "read_parquet", 1)
+
+    assert classify((fit,)) == "model fit"
+    assert classify((metrics,)) == "metrics"
+    assert stage_summary(Counter({(load,): 3, (("x.py", "f", 1),): 1})) == {
+        "data load": 3,
+        "other": 1,
+    }
+
+
+def test_prune_folded_keeps_newest(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"p{i}.folded"
+        path.write_text("a 1\n")
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    (tmp_path / "notes.txt").write_text("")
+
+    assert prune_folded(str(tmp_path), 2) == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "notes.txt",
+        "p3.folded",
+        "p4.folded",
+    ]
+
+
+def test_profile_main_passes_module_arguments(tmp_path, monkeypatch):
+    (tmp_path / "argparse_script.py").write_text(
+        "import argparse\n"
+        "seen = []\n"
+        "def main():\n"
+        "    parser = argparse.ArgumentParser()\n"
+        "    parser.add_argument('--encoding', default='onehot')\n"
+        "    seen.append(parser.parse_args().encoding)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr("sys.argv", ["run", "argparse_script", "--out", "x"])
+
+    profile_main("argparse_script", str(tmp_path), 0.01)
+    profile_main("argparse_script", str(tmp_path), 0.01, ["--encoding", "native"])
+
+    assert sys.modules["argparse_script"].seen == ["onehot", "native"]
+    assert sys.argv == ["run", "argparse_script", "--out", "x"]
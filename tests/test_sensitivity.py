@@ -0,0 +1,64 @@
+# tests/test_sensitivity.py
+import pytest
+
+from src.inference.sensitivity import build_grid, numeric_range
+
+
+def test_numeric_range_rounds_integer_fields():
+    assert numeric_range(1, 3, 5) == [1, 2, 3]
+    assert numeric_range(0, 1, 3, integer=False) == [0.0, 0.5, 1.0]
+
+
+def test_build_grid(payload):
+    axes = {"time_in_hospital": [1, 2, 3], "insulin": ["No", "Up"]}
+    grid = build_grid(payload, axes)
+
+    assert len(grid) == 7
+    assert grid["time_in_hospital"].tolist() == [1, 1, 2, 2, 3, 3, 3]
+    assert grid["insulin"].tolist()[:4] == ["No", "Up", "No", "Up"]
+    # Last row is the unchanged patient
+    assert grid.iloc[-1].to_dict() == payload
+    assert (grid["age"] == payload["age"]).all()
+
+
+def test_build_grid_rejects_oversized_sweep(payload):
+    axes = {"num_lab_procedures": list(range(200)), "num_medications": list(range(60))}
+
+    with pytest.raises(ValueError):
+        build_grid(payload, axes)
+
+
+def test_sensitivity_endpoint(client, payload):
+    body = {
+        "patient": payload,
+        "axes": [
+            {"field": "time_in_hospital", "start": 1, "stop": 14, "num": 14},
+            {"field": "insulin", "values": ["No", "Up", "Down"]},
+        ],
+    }
+    response = client.post("/predict/sensitivity", json=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["fields"] == ["time_in_hospital", "insulin"]
+    assert len(result["probabilities"]) == 14
+    assert len(result["probabilities"][0]) == 3
+    assert result["baseline_probability"] == 0.75
+
+
+@pytest.mark.parametrize(
+    "axis",
+    [
+        {"field": "patient_nbr", "values": [1]},
+        {"field": "time_in_hospital", "values": ["long"]},
+        {"field": "insulin", "start": 1, "stop": 2},
+        {"field": "num_medications", "start": 1, "stop": 60, "num": 10**9},
+        {"field": "num_lab_procedures", "start": 0, "stop": 20_000, "num": 10_001},
+    ],
+)
+def test_sensitivity_rejects_bad_axes(client, payload, axis):
+    response = client.post(
+        "/predict/sensitivity", json={"patient": payload, "axes": [axis]}
+    )
+
+    assert response.status_code == 422
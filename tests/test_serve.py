@@ -0,0 +1,76 @@
+# tests/test_serve.py
+import os
+import signal
+import threading
+import time
+
+from app.serve import RestartLimiter, memory_report, read_memory, supervise
+
+
+def test_read_memory_current_process():
+    usage = read_memory(os.getpid())
+
+    assert usage["pid"] == os.getpid()
+    assert usage["rss_kb"] > 0
+    assert usage["unique_kb"] + usage["shared_kb"] == usage["rss_kb"]
+
+
+def test_memory_report_skips_exited_workers():
+    rows = memory_report(os.getpid(), [2**22 + 1])
+
+    assert [row["role"] for row in rows] == ["master"]
+
+
+def fork_worker(code=None):
+    """
+    A child that exits with `code` at once, or sleeps until SIGTERM
+    """
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if code is None:
+            time.sleep(30)
+        os._exit(code or 0)
+    return pid
+
+
+def test_crashed_worker_prints_traceback(monkeypatch, capfd):
+    from app import serve
+
+    def run_worker(sock, log_level):
+        raise RuntimeError("model file unreadable")
+
+    monkeypatch.setattr(serve, "run_worker", run_worker)
+    pid = serve.spawn_worker(None, "warning")
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 1
+    assert "RuntimeError: model file unreadable" in capfd.readouterr().err
+
+
+def test_restart_limiter_backs_off_then_gives_up():
+    limiter = RestartLimiter(max_restarts=3, window_s=60, backoff_s=0.5)
+
+    assert [limiter.next_delay(0.0) for _ in range(3)] == [0.5, 1.0, 2.0]
+    assert limiter.next_delay(1.0) is None
+    # Restarts older than the window no longer count
+    assert limiter.next_delay(100.0) == 0.5
+
+
+def test_supervise_stops_crash_looping_workers():
+    spawned = []
+
+    def spawn():
+        spawned.append(fork_worker(code=3))
+        return spawned[-1]
+
+    limiter = RestartLimiter(max_restarts=2, backoff_s=0.01)
+
+    assert supervise(spawn, 2, limiter) == 1
+    assert len(spawned) == 4
+
+
+def test_supervise_exits_cleanly_on_sigterm():
+    threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGTERM)).start()
+
+    assert supervise(fork_worker, 2, RestartLimiter()) == 0
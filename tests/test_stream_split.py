@@ -0,0 +1,116 @@
+# tests/test_stream_split.py
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.data.stream_split import (
+    DEFAULT_FRACTIONS,
+    assign_splits,
+    main,
+    patient_buckets,
+    stream_split,
+    summarize,
+)
+
+
+def make_encounters(patients, start=0):
+    rng = np.random.default_rng(start)
+    n = len(patients)
+    return pd.DataFrame(
+        {
+            "encounter_id": np.arange(start, start + n),
+            "patient_nbr": patients,
+            "diag_1": rng.choice(["428", "250.83", "V57"], n),
+            "readmitted": rng.choice(["<30", ">30", "NO"], n),
+        }
+    )
+
+
+def read_split(out_dir, split):
+    df = pd.read_parquet(out_dir / f"split={split}")
+    return df.sort_values("encounter_id").reset_index(drop=True)
+
+
+def test_assignment_is_stable():
+    patients = pd.Series(np.arange(20_000))
+    splits = assign_splits(patient_buckets(patients), DEFAULT_FRACTIONS)
+
+    # Pure function of the id: same answer in any order or chunk
+    shuffled = patients.sample(frac=1, random_state=0)
+    again = assign_splits(patient_buckets(shuffled), DEFAULT_FRACTIONS)
+    assert (again == splits[shuffled.to_numpy()]).all()
+
+    shares = pd.Series(splits).value_counts(normalize=True)
+    for name, fraction in DEFAULT_FRACTIONS.items():
+        assert shares[name] == pytest.approx(fraction, abs=0.02)
+
+
+def test_chunked_split_matches_whole(tmp_path):
+    rng = np.random.default_rng(1)
+    df = make_encounters(rng.integers(0, 300, 2_000))
+    df.to_csv(tmp_path / "raw.csv", index=False)
+
+    stream_split([str(tmp_path / "raw.csv")], str(tmp_path / "a"), chunk_size=97)
+    stream_split([str(tmp_path / "raw.csv")], str(tmp_path / "b"), chunk_size=5_000)
+
+    for split in DEFAULT_FRACTIONS:
+        chunked = read_split(tmp_path / "a", split)
+        whole = read_split(tmp_path / "b", split)
+        pd.testing.assert_frame_equal(chunked, whole)
+        assert chunked["diag_1"].isin(["428", "250.83", "V57"]).all()
+
+    result = summarize(str(tmp_path / "a"))
+    assert sum(result["patient_overlap"].values()) == 0
+    assert sum(s["rows"] for s in result["splits"].values()) == 2_000
+    train = read_split(tmp_path / "a", "train")
+    assert result["splits"]["train"]["target_rate"] == pytest.approx(
+        train["readmitted_binary"].mean()
+    )
+
+
+def test_append_keeps_patients_in_place(tmp_path):
+    out = tmp_path / "splits"
+    first = make_encounters(np.arange(200))
+    first.to_parquet(tmp_path / "first.parquet")
+    stream_split([str(tmp_path / "first.parquet")], str(out))
+    before = {s: set(read_split(out, s)["patient_nbr"]) for s in DEFAULT_FRACTIONS}
+
+    # Returning patients plus new ones
+    later = make_encounters(np.arange(100, 300), start=1_000)
+    later.to_parquet(tmp_path / "later.parquet")
+    assert main([str(tmp_path / "later.parquet"), "--out", str(out), "--append"]) == 0
+
+    for split in DEFAULT_FRACTIONS:
+        after = set(read_split(out, split)["patient_nbr"])
+        assert before[split] <= after
+
+    with pytest.raises(ValueError, match="not empty"):
+        stream_split([str(tmp_path / "later.parquet")], str(out))
+    with pytest.raises(ValueError, match="move patients"):
+        stream_split([str(tmp_path / "later.parquet")], str(out), salt="x", append=True)
+
+
+def test_later_chunk_fills_column_null_in_first(tmp_path):
+    df = make_encounters(np.arange(12))
+    df["max_glu_serum"] = ["None"] * 9 + [">200", "Norm", "None"]
+    df["time_in_hospital"] = 3
+    df.to_csv(tmp_path / "raw.csv", index=False)
+
+    out = tmp_path / "splits"
+    stream_split([str(tmp_path / "raw.csv")], str(out), chunk_size=3)
+
+    written = pd.read_parquet(out).sort_values("encounter_id")
+    assert written["max_glu_serum"].tolist() == [None] * 9 + [">200", "Norm", None]
+
+    # An append inferring other types (float time_in_hospital, null
+    # max_glu_serum) is cast to the dataset's schema
+    later = make_encounters(np.arange(12, 20), start=100)
+    later["max_glu_serum"] = None
+    later["time_in_hospital"] = 2.0
+    later.to_parquet(tmp_path / "later.parquet")
+    stream_split([str(tmp_path / "later.parquet")], str(out), append=True)
+
+    schemas = {str(pq.read_schema(path)) for path in out.glob("split=*/*.parquet")}
+    assert len(schemas) == 1
+    assert len(pd.read_parquet(out)) == 20
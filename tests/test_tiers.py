@@ -0,0 +1,41 @@
+# tests/test_tiers.py
+from src.inference.tiers import (
+    queue_saturated,
+    resolve_tiers,
+    tier_for_budget,
+    tier_for_load,
+)
+
+PROFILE = [
+    {"n_trees": 50, "latency_ms": 1.0},
+    {"n_trees": 200, "latency_ms": 2.0},
+    {"n_trees": 571, "latency_ms": 4.0},
+]
+TIERS = resolve_tiers({"tiers": {"fast": 50, "full": 571, "balanced": 200}})
+
+
+def test_resolve_tiers_orders_by_trees():
+    assert list(TIERS) == ["full", "balanced", "fast"]
+    assert resolve_tiers({}) == {"full": None}
+
+
+def test_tier_for_budget():
+    assert tier_for_budget(TIERS, PROFILE, 10.0) == "full"
+    assert tier_for_budget(TIERS, PROFILE, 2.0) == "balanced"
+    assert tier_for_budget(TIERS, PROFILE, 0.1) == "fast"
+
+    # Without a batch timing, rows count as single-row calls
+    assert tier_for_budget(TIERS, PROFILE, 10.0, n_rows=4) == "balanced"
+
+
+def test_tier_for_load():
+    assert tier_for_load(TIERS, in_flight=1, overload_step=8) == "full"
+    assert tier_for_load(TIERS, in_flight=9, overload_step=8) == "balanced"
+    assert tier_for_load(TIERS, in_flight=100, overload_step=8) == "fast"
+    assert tier_for_load(TIERS, in_flight=100, overload_step=0) == "full"
+
+
+def test_queue_saturated_past_cheapest_tier():
+    assert not queue_saturated(TIERS, in_flight=24, overload_step=8)
+    assert queue_saturated(TIERS, in_flight=25, overload_step=8)
+    assert not queue_saturated(TIERS, in_flight=100, overload_step=0)